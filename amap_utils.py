@@ -0,0 +1,107 @@
+"""高德 Web API 脚本共用的 HTTP 会话、限流器、JSON 磁盘缓存与门店名匹配规则"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # 无 orjson 时使用标准库 json
+    orjson = None
+
+# 门店名中与商场 POI 名无关的门店后缀，POI 打分前先去掉
+STORE_SUFFIX_PATTERN = re.compile("授权体验店|照材店")
+# 同一个高德 Key 的 Web 服务 QPS 配额，各脚本的 RateLimiter 统一按此限流；
+# 超配额的请求会以 status != "1" 返回，调用方不应缓存这类结果
+AMAP_QPS = 3
+
+
+def create_session(pool_connections: int = 8, pool_maxsize: int = 16) -> requests.Session:
+    """创建复用连接的 Session（带连接池与重试），避免每次请求重新握手"""
+    session = requests.Session()
+    retry_strategy = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry_strategy,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class RateLimiter:
+    """线程安全的简单限流器：保证相邻两次请求至少间隔 1/qps 秒"""
+
+    def __init__(self, qps: float):
+        self.interval = 1.0 / qps
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def load_json_cache(path: Path, max_age: Optional[float] = None) -> Dict[str, Any]:
+    """
+    读取 JSON 缓存文件，不存在或损坏时返回空字典
+
+    max_age（秒）不为空时，条目格式为 cache_entry() 生成的 {"ts": 写入时间, "result": 结果}，
+    超过 max_age 的条目与不带时间戳的旧格式条目都在加载时丢弃（视为未命中）
+    """
+    if not path.exists():
+        return {}
+    try:
+        raw = path.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"[警告] 读取缓存失败，忽略 {path.name}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    if max_age is None:
+        return data
+    expire_before = time.time() - max_age
+    return {
+        key: entry
+        for key, entry in data.items()
+        if isinstance(entry, dict)
+        and isinstance(entry.get("ts"), (int, float))
+        and entry["ts"] >= expire_before
+    }
+
+
+def cache_entry(result: Any) -> Dict[str, Any]:
+    """带写入时间戳的缓存条目，配合 load_json_cache(max_age=...) 使用"""
+    return {"ts": time.time(), "result": result}
+
+
+def save_json_cache(path: Path, cache: Dict[str, Any]) -> None:
+    """写回 JSON 缓存文件（自动创建目录），失败时只打印警告"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            path.write_bytes(orjson.dumps(dict(cache)))
+        else:
+            path.write_text(json.dumps(dict(cache), ensure_ascii=False), encoding="utf-8")
+    except OSError as e:
+        print(f"[警告] 写入缓存失败 {path.name}: {e}")
@@ -103,7 +103,9 @@ def load_stores(session: Session, path: Path, slug_to_id: Dict[str, int], mall_c
     chunks = pd.read_csv(path, chunksize=5000)
     for chunk in chunks:
         records = []
-        for _, row in chunk.iterrows():
+        # NaN -> None once per chunk, so the `or` fallbacks and .strip() below never see NaN
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.to_dict("records"):
             brand_slug = (row.get("brand_slug") or "").strip()
             brand_id = slug_to_id.get(brand_slug)
             if not brand_id:
@@ -10,7 +10,7 @@
 
 from __future__ import annotations
 
-import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
@@ -20,6 +20,7 @@ from geopy.distance import geodesic
 
 from update_precise_coordinates import (
     AMAP_TEXT_API,
+    RATE_LIMITER,
     load_env_key,
     search_store_by_name,
 )
@@ -27,6 +28,8 @@ from update_precise_coordinates import (
 BASE_DIR = Path(__file__).resolve().parent
 FAR_STORES_CSV = BASE_DIR / "tmp_far_stores_66.csv"
 OUTPUT_CSV = BASE_DIR / "tmp_far_store_amap_compare.csv"
+# 并发请求高德的线程数；所有门店/商场搜索共用 RATE_LIMITER，总速率不随线程数增加
+MAX_WORKERS = 4
 
 # 视为“购物中心/商场”的高德 typecode 前缀
 MALL_TYPE_PREFIXES = (
@@ -67,6 +70,7 @@ def _call_amap_text_api(
     if types:
         params["types"] = types
 
+    RATE_LIMITER.acquire()
     resp = requests.get(AMAP_TEXT_API, params=params, timeout=15)
     resp.raise_for_status()
     return resp.json()
@@ -159,8 +163,6 @@ def search_mall_by_name(mall_name: str, city: str, api_key: str) -> Optional[Dic
         if best_score >= 20.0:
             break
 
-        time.sleep(0.3)
-
     if best and best_score >= 10.0:
         return best
     return None
@@ -187,6 +189,118 @@ def classify_improvement(current_dist: float, new_dist: Optional[float]) -> str:
     return "改善有限或更差"
 
 
+def check_far_store(row: Dict[str, Any], api_key: str) -> Tuple[Dict[str, Any], str]:
+    """对单家远距门店调用高德搜索门店/商场并计算各组合距离，返回 (结果行, 进度描述)。"""
+    brand = str(row.get("brand") or "").strip()
+    store_id = str(row.get("store_id") or "").strip()
+    store_name = str(row.get("store_name") or "").strip()
+    store_city = str(row.get("store_city") or "").strip()
+    store_type = str(row.get("store_type") or "").strip()
+
+    mall_id = str(row.get("mall_id") or "").strip()
+    mall_name = str(row.get("mall_name") or "").strip()
+    mall_city = str(row.get("mall_city") or "").strip()
+
+    store_lat = float(row.get("store_lat"))
+    store_lng = float(row.get("store_lng"))
+    mall_lat = float(row.get("mall_lat"))
+    mall_lng = float(row.get("mall_lng"))
+    current_dist = float(row.get("distance_m"))
+
+    # 高德门店搜索
+    amap_store = None
+    try:
+        amap_store = search_store_by_name(store_name, store_city, brand)
+    except Exception as exc:  # noqa: BLE001
+        print(f"  [错误] 搜索门店失败: {exc}")
+
+    # 高德商场搜索
+    amap_mall = None
+    try:
+        amap_mall = search_mall_by_name(mall_name, mall_city or store_city, api_key)
+    except Exception as exc:  # noqa: BLE001
+        print(f"  [错误] 搜索商场失败: {exc}")
+
+    # 现有坐标之间的距离（理论上与 distance_m 一致，仅做校验）
+    dist_store_to_mall = _calc_distance((store_lat, store_lng), (mall_lat, mall_lng))
+
+    # 各种组合的距离
+    dist_store_to_amap_store: Optional[float] = None
+    dist_store_to_amap_mall: Optional[float] = None
+    dist_amap_store_to_amap_mall: Optional[float] = None
+
+    if amap_store:
+        dist_store_to_amap_store = _calc_distance(
+            (store_lat, store_lng),
+            (amap_store["lat"], amap_store["lng"]),
+        )
+
+    if amap_mall:
+        dist_store_to_amap_mall = _calc_distance(
+            (store_lat, store_lng),
+            (amap_mall["lat"], amap_mall["lng"]),
+        )
+
+    if amap_store and amap_mall:
+        dist_amap_store_to_amap_mall = _calc_distance(
+            (amap_store["lat"], amap_store["lng"]),
+            (amap_mall["lat"], amap_mall["lng"]),
+        )
+
+    # 从几种组合中选一个“最佳新距离”用于判断
+    candidate_new_dists = [
+        d
+        for d in [
+            dist_amap_store_to_amap_mall,
+            dist_store_to_amap_mall,
+            dist_store_to_amap_store,
+        ]
+        if d is not None and d > 0
+    ]
+    new_best_dist = min(candidate_new_dists) if candidate_new_dists else None
+    suggestion = classify_improvement(current_dist, new_best_dist)
+
+    return (
+        {
+            "brand": brand,
+            "store_id": store_id,
+            "store_name": store_name,
+            "store_city": store_city,
+            "store_type": store_type,
+            "mall_id": mall_id,
+            "mall_name": mall_name,
+            "mall_city": mall_city,
+            "current_store_to_mall_m": round(dist_store_to_mall, 1),
+            "orig_distance_m": current_dist,
+            "amap_store_name": amap_store["amap_name"] if amap_store else "",
+            "amap_store_address": amap_store["amap_address"] if amap_store else "",
+            "amap_store_lat": amap_store["lat"] if amap_store else "",
+            "amap_store_lng": amap_store["lng"] if amap_store else "",
+            "amap_store_score": amap_store["match_score"] if amap_store else "",
+            "amap_mall_name": amap_mall["amap_name"] if amap_mall else "",
+            "amap_mall_address": amap_mall["amap_address"] if amap_mall else "",
+            "amap_mall_lat": amap_mall["lat"] if amap_mall else "",
+            "amap_mall_lng": amap_mall["lng"] if amap_mall else "",
+            "amap_mall_score": amap_mall["match_score"] if amap_mall else "",
+            "dist_store_to_amap_store_m": round(dist_store_to_amap_store, 1)
+            if dist_store_to_amap_store is not None
+            else "",
+            "dist_store_to_amap_mall_m": round(dist_store_to_amap_mall, 1)
+            if dist_store_to_amap_mall is not None
+            else "",
+            "dist_amap_store_to_amap_mall_m": round(dist_amap_store_to_amap_mall, 1)
+            if dist_amap_store_to_amap_mall is not None
+            else None,
+            "new_best_dist_m": round(new_best_dist, 1) if new_best_dist is not None else None,
+            "improvement_m": round(current_dist - new_best_dist, 1)
+            if new_best_dist is not None
+            else None,
+            "suggestion": suggestion,
+        },
+        f"{brand} - {store_name} ({store_city}) -> {mall_name} ({mall_city}), 当前距离 ~{int(current_dist)}m",
+    )
+
+
 def main() -> None:
     api_key = require_key()
 
@@ -201,119 +315,13 @@ def main() -> None:
     results = []
     total = len(far_df)
 
-    for idx, row in far_df.iterrows():
-        brand = str(row.get("brand") or "").strip()
-        store_id = str(row.get("store_id") or "").strip()
-        store_name = str(row.get("store_name") or "").strip()
-        store_city = str(row.get("store_city") or "").strip()
-        store_type = str(row.get("store_type") or "").strip()
-
-        mall_id = str(row.get("mall_id") or "").strip()
-        mall_name = str(row.get("mall_name") or "").strip()
-        mall_city = str(row.get("mall_city") or "").strip()
-
-        store_lat = float(row.get("store_lat"))
-        store_lng = float(row.get("store_lng"))
-        mall_lat = float(row.get("mall_lat"))
-        mall_lng = float(row.get("mall_lng"))
-        current_dist = float(row.get("distance_m"))
-
-        print(f"\n[{idx + 1}/{total}] {brand} - {store_name} ({store_city}) -> {mall_name} ({mall_city}), 当前距离 ~{int(current_dist)}m")
-
-        # 高德门店搜索
-        amap_store = None
-        try:
-            amap_store = search_store_by_name(store_name, store_city, brand)
-        except Exception as exc:  # noqa: BLE001
-            print(f"  [错误] 搜索门店失败: {exc}")
-
-        # 高德商场搜索
-        amap_mall = None
-        try:
-            amap_mall = search_mall_by_name(mall_name, mall_city or store_city, api_key)
-        except Exception as exc:  # noqa: BLE001
-            print(f"  [错误] 搜索商场失败: {exc}")
-
-        # 现有坐标之间的距离（理论上与 distance_m 一致，仅做校验）
-        dist_store_to_mall = _calc_distance((store_lat, store_lng), (mall_lat, mall_lng))
-
-        # 各种组合的距离
-        dist_store_to_amap_store: Optional[float] = None
-        dist_store_to_amap_mall: Optional[float] = None
-        dist_amap_store_to_amap_mall: Optional[float] = None
-
-        if amap_store:
-            dist_store_to_amap_store = _calc_distance(
-                (store_lat, store_lng),
-                (amap_store["lat"], amap_store["lng"]),
-            )
-
-        if amap_mall:
-            dist_store_to_amap_mall = _calc_distance(
-                (store_lat, store_lng),
-                (amap_mall["lat"], amap_mall["lng"]),
-            )
-
-        if amap_store and amap_mall:
-            dist_amap_store_to_amap_mall = _calc_distance(
-                (amap_store["lat"], amap_store["lng"]),
-                (amap_mall["lat"], amap_mall["lng"]),
-            )
-
-        # 从几种组合中选一个“最佳新距离”用于判断
-        candidate_new_dists = [
-            d
-            for d in [
-                dist_amap_store_to_amap_mall,
-                dist_store_to_amap_mall,
-                dist_store_to_amap_store,
-            ]
-            if d is not None and d > 0
-        ]
-        new_best_dist = min(candidate_new_dists) if candidate_new_dists else None
-        suggestion = classify_improvement(current_dist, new_best_dist)
-
-        results.append(
-            {
-                "brand": brand,
-                "store_id": store_id,
-                "store_name": store_name,
-                "store_city": store_city,
-                "store_type": store_type,
-                "mall_id": mall_id,
-                "mall_name": mall_name,
-                "mall_city": mall_city,
-                "current_store_to_mall_m": round(dist_store_to_mall, 1),
-                "orig_distance_m": current_dist,
-                "amap_store_name": amap_store["amap_name"] if amap_store else "",
-                "amap_store_address": amap_store["amap_address"] if amap_store else "",
-                "amap_store_lat": amap_store["lat"] if amap_store else "",
-                "amap_store_lng": amap_store["lng"] if amap_store else "",
-                "amap_store_score": amap_store["match_score"] if amap_store else "",
-                "amap_mall_name": amap_mall["amap_name"] if amap_mall else "",
-                "amap_mall_address": amap_mall["amap_address"] if amap_mall else "",
-                "amap_mall_lat": amap_mall["lat"] if amap_mall else "",
-                "amap_mall_lng": amap_mall["lng"] if amap_mall else "",
-                "amap_mall_score": amap_mall["match_score"] if amap_mall else "",
-                "dist_store_to_amap_store_m": round(dist_store_to_amap_store, 1)
-                if dist_store_to_amap_store is not None
-                else "",
-                "dist_store_to_amap_mall_m": round(dist_store_to_amap_mall, 1)
-                if dist_store_to_amap_mall is not None
-                else "",
-                "dist_amap_store_to_amap_mall_m": round(dist_amap_store_to_amap_mall, 1)
-                if dist_amap_store_to_amap_mall is not None
-                else None,
-                "new_best_dist_m": round(new_best_dist, 1) if new_best_dist is not None else None,
-                "improvement_m": round(current_dist - new_best_dist, 1)
-                if new_best_dist is not None
-                else None,
-                "suggestion": suggestion,
-            }
-        )
-
-        # 控制请求节奏，避免触发高德频率限制
-        time.sleep(0.3)
+    # 各门店互不依赖，用线程池并发请求高德；结果按原顺序输出
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        rows = far_df.to_dict("records")
+        checked = executor.map(lambda row: check_far_store(row, api_key), rows)
+        for idx, (result, desc) in enumerate(checked):
+            print(f"[{idx + 1}/{total}] {desc}")
+            results.append(result)
 
     out_df = pd.DataFrame(results)
     out_df = out_df.sort_values("new_best_dist_m", na_position="last")
@@ -0,0 +1,13 @@
+"""各脚本共用的 pandas 小工具"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+
+def build_position_index(ids: pd.Series) -> dict[str, list[int]]:
+    """id（去空白字符串）-> 行位置列表，用 O(1) 查表代替逐次整列比较"""
+    index: dict[str, list[int]] = {}
+    for pos, value in enumerate(ids.astype(str).str.strip()):
+        index.setdefault(value, []).append(pos)
+    return index
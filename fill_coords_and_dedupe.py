@@ -76,6 +76,9 @@ def adcode_to_levels(adcode: str) -> Tuple[Optional[str], Optional[str], Optiona
     return prov, city, dist
 
 
+FILL_COLS = ["province", "city", "district", "province_code", "city_code", "district_code"]
+
+
 def dedupe(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
     df["__name_key"] = df.get("name", "").fillna("").str.strip().str.lower()
     df["__addr_key"] = df.get("address", "").fillna("").str.strip().str.lower()
@@ -96,6 +99,13 @@ def process_file(path: Path, out_dir: Path, geocoder: AMapGeocoder) -> dict:
 
     # rows needing geocode: lat/lng 缺失
     need_geo = df["lat"].isna() | df["lng"].isna()
+    # 待回填列的“为空”（NaN 或空白字符串）判断整列预先算好，循环结束后按列回填
+    blank = {
+        c: df[c].isna() | df[c].astype(str).str.strip().eq("")
+        for c in FILL_COLS
+        if c in df.columns
+    }
+    filled: Dict[object, Dict[str, object]] = {}
     geocoded = 0
     for idx in df[need_geo].index:
         name = str(df.at[idx, "name"]) if "name" in df.columns else ""
@@ -120,24 +130,25 @@ def process_file(path: Path, out_dir: Path, geocoder: AMapGeocoder) -> dict:
         df.at[idx, "coord_system"] = "gcj02"
         df.at[idx, "coord_source"] = "amap_geocode"
         df.at[idx, "source"] = df.at[idx, "source"] if "source" in df.columns else "amap_geocode"
-        # fill province/city/district if missing
-        if pd.isna(df.at[idx, "province"]) or not str(df.at[idx, "province"]).strip():
-            df.at[idx, "province"] = result.get("province")
-        if pd.isna(df.at[idx, "city"]) or not str(df.at[idx, "city"]).strip():
-            df.at[idx, "city"] = result.get("city") or result.get("province")
-        if "district" in df.columns:
-            if pd.isna(df.at[idx, "district"]) or not str(df.at[idx, "district"]).strip():
-                df.at[idx, "district"] = result.get("district")
+        # province/city/district 及 adcode 各级代码先收集，循环后只回填原本为空的格子
         adcode = result.get("adcode")
         prov_code, city_code, dist_code = adcode_to_levels(adcode) if adcode else (None, None, None)
-        if "province_code" in df.columns and (pd.isna(df.at[idx, "province_code"]) or not str(df.at[idx, "province_code"]).strip()):
-            df.at[idx, "province_code"] = prov_code
-        if "city_code" in df.columns and (pd.isna(df.at[idx, "city_code"]) or not str(df.at[idx, "city_code"]).strip()):
-            df.at[idx, "city_code"] = city_code
-        if "district_code" in df.columns and (pd.isna(df.at[idx, "district_code"]) or not str(df.at[idx, "district_code"]).strip()):
-            df.at[idx, "district_code"] = dist_code
+        filled[idx] = {
+            "province": result.get("province"),
+            "city": result.get("city") or result.get("province"),
+            "district": result.get("district"),
+            "province_code": prov_code,
+            "city_code": city_code,
+            "district_code": dist_code,
+        }
         geocoded += 1
 
+    if filled:
+        fill_df = pd.DataFrame.from_dict(filled, orient="index")
+        for c, mask in blank.items():
+            rows = fill_df.index[mask.loc[fill_df.index].to_numpy()]
+            df.loc[rows, c] = fill_df.loc[rows, c]
+
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / path.name
     df.to_csv(out_path, index=False, encoding="utf-8-sig")
@@ -142,10 +142,9 @@ def main():
     # 重新计算 store_count
     print(f"\n[更新] 重新计算商场 store_count")
     store_counts = store_df.groupby('mall_id').size()
-    for mall_id in mall_df['mall_id'].unique():
-        if pd.notna(mall_id):
-            count = store_counts.get(mall_id, 0)
-            mall_df.loc[mall_df['mall_id'] == mall_id, 'store_count'] = count
+    # 一次 map 回填，避免对每个 mall_id 做整列比较
+    has_id = mall_df['mall_id'].notna()
+    mall_df.loc[has_id, 'store_count'] = mall_df.loc[has_id, 'mall_id'].map(store_counts).fillna(0).astype(int)
     
     # 保存
     mall_df.to_csv(MALL_CSV, index=False)
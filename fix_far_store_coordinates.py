@@ -34,32 +34,45 @@ def collect_far_store_ids(threshold_m: float = 2000.0) -> list[str]:
     store_df = pd.read_csv(STORE_MASTER)
     mall_df = pd.read_csv(MALL_MASTER)
 
-    mall_by_id = {str(r["mall_id"]): r for _, r in mall_df.iterrows()}
+    # mall_id -> 商场坐标（重复 id 以最后一行为准）
+    mall_coords = (
+        mall_df.assign(_key=mall_df["mall_id"].map(str))
+        .drop_duplicates("_key", keep="last")
+        .set_index("_key")
+    )
+
+    stores = store_df[store_df["mall_id"].notna()]
+    mall_keys = stores["mall_id"].map(str)
+    m_lat = mall_keys.map(mall_coords["mall_lat"])
+    m_lng = mall_keys.map(mall_coords["mall_lng"])
+
+    # 白名单门店：业务确认可以接受“远距离”，不再参与自动修正
+    whitelisted = stores["store_id"].map(lambda v: str(v or "").strip()).isin(WHITELIST_FAR_STORE_IDS)
+
+    # 缺商场、缺坐标、白名单整列一次性过滤，循环内不再逐个 pd.isna
+    valid = (
+        ~whitelisted
+        & stores["corrected_lat"].notna()
+        & stores["corrected_lng"].notna()
+        & m_lat.notna()
+        & m_lng.notna()
+    )
+    rows = zip(
+        stores.loc[valid, "store_id"],
+        stores.loc[valid, "corrected_lat"],
+        stores.loc[valid, "corrected_lng"],
+        m_lat[valid],
+        m_lng[valid],
+    )
 
     far_ids: list[str] = []
-    for _, store in store_df.iterrows():
-        mall_id = store.get("mall_id")
-        if pd.isna(mall_id):
-            continue
-        mall = mall_by_id.get(str(mall_id))
-        if mall is None:
-            continue
-
-        # 白名单门店：业务确认可以接受“远距离”，不再参与自动修正
-        store_id = str(store.get("store_id") or "").strip()
-        if store_id in WHITELIST_FAR_STORE_IDS:
-            continue
-
-        s_lat, s_lng = store.get("corrected_lat"), store.get("corrected_lng")
-        m_lat, m_lng = mall.get("mall_lat"), mall.get("mall_lng")
-        if pd.isna(s_lat) or pd.isna(s_lng) or pd.isna(m_lat) or pd.isna(m_lng):
-            continue
+    for store_id, s_lat, s_lng, mall_lat, mall_lng in rows:
         try:
-            d = geodesic((s_lat, s_lng), (m_lat, m_lng)).meters
+            d = geodesic((s_lat, s_lng), (mall_lat, mall_lng)).meters
         except Exception:
             continue
         if d > threshold_m:
-            far_ids.append(str(store["store_id"]))
+            far_ids.append(str(store_id))
     return far_ids
 
 
@@ -72,6 +85,11 @@ def main() -> None:
     all_df = pd.read_csv(ALL_STORES)
 
     mall_by_id = {str(r["mall_id"]): r for _, r in mall_df.iterrows()}
+    # id -> 行位置，一次建好，循环内不再逐个整列比较
+    store_pos = store_df.groupby(store_df["store_id"].map(str), sort=False).indices
+    all_pos = all_df.groupby(all_df["uuid"].map(str), sort=False).indices
+    store_lat_col, store_lng_col = store_df.columns.get_indexer(["corrected_lat", "corrected_lng"])
+    all_lat_col, all_lng_col = all_df.columns.get_indexer(["lat", "lng"])
 
     far_store_ids = collect_far_store_ids()
     print(f"[信息] 当前检测到距离 >2km 的门店: {len(far_store_ids)} 条")
@@ -80,7 +98,11 @@ def main() -> None:
     skipped = 0
 
     for sid in far_store_ids:
-        row = store_df[store_df["store_id"] == sid].iloc[0]
+        positions = store_pos.get(sid)
+        if positions is None:
+            skipped += 1
+            continue
+        row = store_df.iloc[positions[0]]
         name = str(row["name"]).strip()
         city = str(row["city"]).strip()
         brand = str(row["brand"]).strip()
@@ -128,11 +150,12 @@ def main() -> None:
             updated += 1
             continue
 
-        store_df.loc[store_df["store_id"] == sid, "corrected_lat"] = new_lat
-        store_df.loc[store_df["store_id"] == sid, "corrected_lng"] = new_lng
+        store_df.iloc[positions, store_lat_col] = new_lat
+        store_df.iloc[positions, store_lng_col] = new_lng
 
-        all_df.loc[all_df["uuid"] == sid, "lat"] = new_lat
-        all_df.loc[all_df["uuid"] == sid, "lng"] = new_lng
+        if sid in all_pos:
+            all_df.iloc[all_pos[sid], all_lat_col] = new_lat
+            all_df.iloc[all_pos[sid], all_lng_col] = new_lng
 
         updated += 1
 
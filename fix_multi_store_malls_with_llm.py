@@ -231,9 +231,9 @@ def fix_multi_store_malls():
 
     # 更新 store_count
     counts = store_df.groupby("mall_id").size()
-    for mid in mall_df["mall_id"].unique():
-        if isinstance(mid, str) and mid:
-            mall_df.loc[mall_df["mall_id"] == mid, "store_count"] = counts.get(mid, 0)
+    # 一次 map 回填，避免对每个 mall_id 做整列比较
+    has_id = mall_df["mall_id"].map(lambda mid: isinstance(mid, str) and bool(mid))
+    mall_df.loc[has_id, "store_count"] = mall_df.loc[has_id, "mall_id"].map(counts).fillna(0).astype(int)
 
     store_df.to_csv(STORE_CSV, index=False, encoding="utf-8-sig")
     mall_df.to_csv(MALL_CSV, index=False, encoding="utf-8-sig")
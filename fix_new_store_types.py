@@ -12,44 +12,69 @@
 
 from __future__ import annotations
 
-import json
+import shutil
+from functools import lru_cache
 from pathlib import Path
 
 import pandas as pd
 
+from data_utils import build_position_index
+
 BASE = Path(__file__).resolve().parent
 STORE_MASTER = BASE / "Store_Master_Cleaned.csv"
 ALL_STORES = BASE / "all_stores_final.csv"
 DJI_RAW = BASE / "dji_offline_stores.csv"
 INSTA_RAW = BASE / "insta360_offline_stores.csv"
+# 品牌 -> 爬虫原始表；文件缺失的品牌整体跳过
+SPIDER_FILES = {"DJI": DJI_RAW, "Insta360": INSTA_RAW}
+# 爬虫原始表只需要这几列，全部按字符串读取
+SPIDER_COLUMNS = ("name", "city", "raw_source", "raw")
+
+
+def read_spider_csv(path: Path) -> pd.DataFrame:
+    """只读取 SPIDER_COLUMNS 中存在的列，跳过类型推断，并去掉完全重复的行。"""
+    df = pd.read_csv(path, usecols=lambda c: c in SPIDER_COLUMNS, dtype=str)
+    # 重复行推导结果相同，type_map 又只保留首个命中，提前去重不影响结果
+    return df.drop_duplicates(ignore_index=True)
 
 
 def load_dfs():
     store_df = pd.read_csv(STORE_MASTER)
     all_df = pd.read_csv(ALL_STORES)
-    dji_df = pd.read_csv(DJI_RAW)
-    insta_df = pd.read_csv(INSTA_RAW)
-    return store_df, all_df, dji_df, insta_df
+    spider_dfs = {
+        brand: read_spider_csv(path) for brand, path in SPIDER_FILES.items() if path.exists()
+    }
+    return store_df, all_df, spider_dfs
 
 
-def normalize(value) -> str:
-    if pd.isna(value):
-        return ""
-    return str(value).strip()
+def normalize_column(df: pd.DataFrame, col: str) -> pd.Series:
+    """整列标准化：空值转空串并去除首尾空白；列不存在时返回全空列。"""
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].fillna("").astype(str).str.strip()
 
 
-def build_spider_type_map(dji_df: pd.DataFrame, insta_df: pd.DataFrame) -> dict[tuple[str, str, str], str]:
+def build_spider_type_map(spider_dfs: dict[str, pd.DataFrame]) -> dict[tuple[str, str, str], str]:
     """构建 (brand, name, city) -> store_type 映射，使用 merge_spider_data 的规则。"""
     from merge_spider_data import derive_store_type  # type: ignore
 
+    # 爬虫 raw_source 模板重复度高，按 (raw_source, brand) 缓存解析结果
+    derive_cached = lru_cache(maxsize=8192)(derive_store_type)
+
     type_map: dict[tuple[str, str, str], str] = {}
 
     def ingest(df: pd.DataFrame, brand: str):
-        for _, row in df.iterrows():
-            name = normalize(row.get("name"))
-            city = normalize(row.get("city"))
-            raw_source = row.get("raw_source") or row.get("raw") or ""
-            st = derive_store_type(raw_source, brand)
+        # 整列一次性清洗，避免逐行 normalize
+        names = normalize_column(df, "name")
+        cities = normalize_column(df, "city")
+        raw_sources = pd.Series("", index=df.index, dtype=object)
+        for col in ("raw", "raw_source"):
+            if col in df.columns:
+                col_values = df[col].fillna("")
+                raw_sources = col_values.where(col_values.astype(bool), raw_sources)
+
+        for name, city, raw_source in zip(names, cities, raw_sources):
+            st = derive_cached(str(raw_source), brand)
             if not st:
                 continue
             key = (brand, name, city)
@@ -57,14 +82,21 @@ def build_spider_type_map(dji_df: pd.DataFrame, insta_df: pd.DataFrame) -> dict[
             if key not in type_map:
                 type_map[key] = st
 
-    ingest(dji_df, "DJI")
-    ingest(insta_df, "Insta360")
+    for brand, df in spider_dfs.items():
+        ingest(df, brand)
     return type_map
 
 
 def fix_new_store_types(target_opened_at: str = "2025-11-27") -> None:
-    store_df, all_df, dji_df, insta_df = load_dfs()
-    type_map = build_spider_type_map(dji_df, insta_df)
+    store_df, all_df, spider_dfs = load_dfs()
+    missing = [brand for brand in SPIDER_FILES if brand not in spider_dfs]
+    if missing:
+        print(f"[提示] 缺少爬虫原始表，跳过品牌: {', '.join(missing)}")
+    type_map = build_spider_type_map(spider_dfs)
+    # 宽松匹配索引：(brand, name, 去掉“市”的 city)，按插入顺序保留首个命中
+    loose_type_map: dict[tuple[str, str, str], str] = {}
+    for (b2, n2, c2), v in type_map.items():
+        loose_type_map.setdefault((b2, n2, c2.replace("市", "")), v)
 
     # 过滤出需要处理的新增门店
     new_mask = store_df["opened_at"].astype(str) == target_opened_at
@@ -75,62 +107,77 @@ def fix_new_store_types(target_opened_at: str = "2025-11-27") -> None:
         print("[提示] 没有符合条件的新增门店，退出。")
         return
 
+    # 仅跳过缺少爬虫原始表的品牌，其余品牌照常匹配（找不到类别的会列出）
+    if missing:
+        skip_mask = normalize_column(new_stores, "brand").isin(missing)
+        if skip_mask.any():
+            print(f"[提示] 缺少爬虫原始表而跳过的新增门店: {int(skip_mask.sum())} 家")
+            new_stores = new_stores[~skip_mask]
+
     updated_master = 0
     updated_all = 0
-
-    for _, row in new_stores.iterrows():
-        brand = normalize(row.get("brand"))
-        name = normalize(row.get("name"))
-        city = normalize(row.get("city"))
+    master_pos = build_position_index(store_df["store_id"])
+    all_pos = build_position_index(all_df["uuid"]) if "store_type" in all_df.columns else {}
+    # store_type 列位置只查一次，循环内用 .iat 按位置写入
+    if "store_type" not in store_df.columns:
+        store_df["store_type"] = ""
+    master_st_col = store_df.columns.get_loc("store_type")
+    all_st_col = all_df.columns.get_loc("store_type") if all_pos else None
+
+    # 匹配键整列预先清洗，循环内不再逐字段 normalize
+    new_keys = zip(
+        normalize_column(new_stores, "brand"),
+        normalize_column(new_stores, "name"),
+        normalize_column(new_stores, "city"),
+        normalize_column(new_stores, "store_id"),
+    )
+    for brand, name, city, store_id in new_keys:
         # 不管当前是否为空，直接覆盖为统一规则（本脚本只针对一批新增门店）
 
         key = (brand, name, city)
         st = type_map.get(key, "")
         if not st:
-            # 尝试更宽松的匹配：仅 name + city
-            for (b2, n2, c2), v in type_map.items():
-                if b2 == brand and n2 == name and c2.replace("市", "") == city.replace("市", ""):
-                    st = v
-                    break
+            # 尝试更宽松的匹配：城市名忽略“市”
+            st = loose_type_map.get((brand, name, city.replace("市", "")), "")
 
         if not st:
             print(f"[跳过] 找不到门店类别: {brand} - {name} ({city})")
             continue
 
-        store_id = normalize(row.get("store_id"))
         if not store_id:
             continue
 
         print(f"[更新] {brand} - {name} ({city}) -> store_type = {st}")
 
-        # 更新主表
-        mask_master = store_df["store_id"].astype(str).str.strip() == store_id
-        if mask_master.any():
-            store_df.loc[mask_master, "store_type"] = st
-            updated_master += int(mask_master.sum())
+        # 更新主表（值相同的行不计数，全部相同则不写回文件）
+        for pos in master_pos.get(store_id, []):
+            if store_df.iat[pos, master_st_col] != st:
+                store_df.iat[pos, master_st_col] = st
+                updated_master += 1
 
         # 更新 all_stores_final（如果有该列）
-        if "store_type" in all_df.columns:
-            mask_all = all_df["uuid"].astype(str).str.strip() == store_id
-            if mask_all.any():
-                all_df.loc[mask_all, "store_type"] = st
-                updated_all += int(mask_all.sum())
+        for pos in all_pos.get(store_id, []):
+            if all_df.iat[pos, all_st_col] != st:
+                all_df.iat[pos, all_st_col] = st
+                updated_all += 1
 
     print(f"[统计] 更新 Store_Master_Cleaned.csv: {updated_master} 条")
     if "store_type" in all_df.columns:
         print(f"[统计] 更新 all_stores_final.csv: {updated_all} 条")
 
-    # 仅当有更新时写回
-    if updated_master or updated_all:
-        backup_master = STORE_MASTER.with_suffix(STORE_MASTER.suffix + ".backup_store_type_fix")
-        backup_all = ALL_STORES.with_suffix(ALL_STORES.suffix + ".backup_store_type_fix")
-        store_df.to_csv(backup_master, index=False, encoding="utf-8-sig")
-        all_df.to_csv(backup_all, index=False, encoding="utf-8-sig")
-        print(f"[备份] 已备份到: {backup_master.name}, {backup_all.name}")
-
-        store_df.to_csv(STORE_MASTER, index=False, encoding="utf-8-sig")
-        all_df.to_csv(ALL_STORES, index=False, encoding="utf-8-sig")
-        print("[完成] 已写回主文件")
+    # 仅写回确有变化的表
+    changed = [
+        (path, df)
+        for path, df, count in ((STORE_MASTER, store_df, updated_master), (ALL_STORES, all_df, updated_all))
+        if count
+    ]
+    if changed:
+        for path, df in changed:
+            backup = path.with_suffix(path.suffix + ".backup_store_type_fix")
+            # 备份直接复制原文件（修改前的数据），每张表只序列化一次
+            shutil.copy2(path, backup)
+            df.to_csv(path, index=False, encoding="utf-8-sig")
+            print(f"[完成] 已写回 {path.name}，备份 {backup.name}")
     else:
         print("[提示] 无任何 store_type 更新，不写回文件")
 
@@ -2,18 +2,27 @@
 
 from __future__ import annotations
 
+import atexit
 import csv
 import json
+import math
 import os
 import re
 import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-import requests
-from geopy.distance import geodesic
 from rapidfuzz import fuzz
+from rapidfuzz import process as fuzz_process
+
+from amap_utils import cache_entry, create_session, load_json_cache, save_json_cache
+
+try:
+    import orjson
+except ImportError:  # 无 orjson 时使用标准库 json
+    orjson = None
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -21,6 +30,10 @@ DJI_CSV = BASE_DIR / "dji_offline_stores.csv"
 INSTA_CSV = BASE_DIR / "insta360_offline_stores.csv"
 MEMORY_CSV = BASE_DIR / "poi_memory.csv"
 OUTPUT_CSV = BASE_DIR / "all_stores_final.csv"
+# 高德 POI 搜索结果的磁盘缓存（按请求参数，不含 key）；超过 30 天的条目视为未命中，
+# 避免商场关闭或搬迁后一直使用旧 POI
+POI_CACHE_PATH = BASE_DIR / "logs" / "amap_poi_cache.json"
+POI_CACHE_MAX_AGE = 30 * 86400
 
 # 记忆文件的列定义
 # insta_is_same_mall_with_dji: 标识 DJI 和 Insta360 门店是否在同一商场
@@ -178,6 +191,23 @@ BRAND_HINTS = {
     "DJI": ["dji", "大疆"],
     "Insta360": ["insta360", "影石"],
 }
+# 需要匹配商场的 Insta360 chainStore 类型
+INSTA_MALL_CHAIN_STORES = frozenset({"授权专卖店", "直营店"})
+
+
+SESSION = create_session(pool_connections=4, pool_maxsize=8)
+
+POI_CACHE = load_json_cache(POI_CACHE_PATH, max_age=POI_CACHE_MAX_AGE)
+_POI_CACHE_SIZE = len(POI_CACHE)
+
+
+def save_poi_cache() -> None:
+    """进程退出时写回有新增条目的 POI 缓存"""
+    if len(POI_CACHE) != _POI_CACHE_SIZE:
+        save_json_cache(POI_CACHE_PATH, POI_CACHE)
+
+
+atexit.register(save_poi_cache)
 
 
 def require_key() -> str:
@@ -294,6 +324,16 @@ def sync_memory_row(memory: Dict[str, Dict[str, str]], brand: str, store_name: s
     update_memory_csv_row(brand, store_name, city, updates)
 
 
+def loads_json(text: str) -> Any:
+    """优先用 orjson 解析；orjson 不接受的非标准 JSON（如 NaN）回退到标准库。"""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
 def parse_raw_source(row: pd.Series) -> Dict[str, Any]:
     raw_source = row.get("raw_source", "")
     if not raw_source:
@@ -302,7 +342,7 @@ def parse_raw_source(row: pd.Series) -> Dict[str, Any]:
         return raw_source
     if isinstance(raw_source, str):
         try:
-            return json.loads(raw_source)
+            return loads_json(raw_source)
         except Exception:
             return {}
     return {}
@@ -496,7 +536,7 @@ def is_insta360_store_need_mall_matching(row: pd.Series) -> bool:
     if source_data:
         chain_store = source_data.get("chainStore", "")
         # 只匹配授权专卖店和直营店
-        if chain_store in ["授权专卖店", "直营店"]:
+        if chain_store in INSTA_MALL_CHAIN_STORES:
             return True
     
     # 如果无法从chainStore判断，返回False（不匹配商场）
@@ -630,6 +670,24 @@ def is_dji_lighting_material_store(row: pd.Series) -> bool:
     return bool(isinstance(raw_source, str) and "New type of lighting material" in raw_source)
 
 
+def fetch_amap_pois(url: str, params: Dict[str, Any]) -> List[Dict]:
+    """调用高德 POI 接口；成功响应的 pois 按 url+参数（不含 key）带时间戳缓存到 POI_CACHE，退出时落盘。"""
+    cache_key = url + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params) if k != "key")
+    entry = POI_CACHE.get(cache_key)
+    if entry is not None:
+        return entry["result"]
+    resp = SESSION.get(url, params=params, timeout=15)
+    resp.raise_for_status()
+    data = resp.json()
+    if data.get("status") != "1":
+        return []
+    pois = data.get("pois", []) or []
+    # 空结果不缓存，下次重新请求
+    if pois:
+        POI_CACHE[cache_key] = cache_entry(pois)
+    return pois
+
+
 def search_amap(lat: float, lng: float, radius: int = 500) -> List[Dict]:
     require_key()
     params = {
@@ -641,12 +699,7 @@ def search_amap(lat: float, lng: float, radius: int = 500) -> List[Dict]:
         "page": 1,
         "extensions": "all",
     }
-    resp = requests.get(AMAP_API, params=params, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
-    if data.get("status") != "1":
-        return []
-    pois = data.get("pois", []) or []
+    pois = fetch_amap_pois(AMAP_API, params)
     return filter_pois(
         pois,
         lambda lat_str, lng_str, poi: float(poi.get("distance") or 0),
@@ -664,27 +717,43 @@ def search_amap_by_name(keyword: str, city: str | float | None, lat: Optional[fl
         "offset": 10,
         "page": 1,
     }
-    resp = requests.get(AMAP_TEXT_API, params=params, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
-    if data.get("status") != "1":
-        return []
-    pois = data.get("pois", []) or []
-    return filter_pois(
-        pois,
-        lambda lat_str, lng_str, poi: float(
-            geodesic_distance_simple(lat, lng, float(lat_str), float(lng_str))
+    pois = fetch_amap_pois(AMAP_TEXT_API, params)
+    results = filter_pois(pois, lambda lat_str, lng_str, poi: 9999.0)
+    if results and lat is not None and lng is not None:
+        # 所有候选的距离一次性向量化计算
+        distances = haversine_m_many(
+            lat,
+            lng,
+            np.fromiter((r["lat"] for r in results), dtype=float, count=len(results)),
+            np.fromiter((r["lng"] for r in results), dtype=float, count=len(results)),
         )
-        if lat is not None and lng is not None
-        else 9999.0,
-    )
+        for r, d in zip(results, distances.tolist()):
+            r["distance"] = d
+    return results
+
+
+def haversine_m_many(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """单点到多点的球面距离（米），无法计算的位置返回 9999.0。"""
+    lat1, lng1 = np.radians(float(lat)), np.radians(float(lng))
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    dist = 2 * 6371000.0 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return np.where(np.isfinite(dist), dist, 9999.0)
 
 
 def geodesic_distance_simple(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """两点球面距离（米），用 Haversine 代替 geopy 椭球计算；无法计算时返回 9999.0。"""
     try:
-        return geodesic((lat1, lng1), (lat2, lng2)).meters
-    except Exception:
+        phi1, phi2 = math.radians(lat1), math.radians(lat2)
+        a = (
+            math.sin((phi2 - phi1) / 2) ** 2
+            + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+        )
+    except (TypeError, ValueError):
+        return 9999.0
+    if not math.isfinite(a):
         return 9999.0
+    return 2 * 6371000.0 * math.asin(math.sqrt(min(1.0, a)))
 
 
 def is_token_like(text: str) -> bool:
@@ -809,7 +878,7 @@ def search_store_location(row: pd.Series) -> Optional[Dict[str, Any]]:
     }
     
     try:
-        resp = requests.get(AMAP_TEXT_API, params=params, timeout=15)
+        resp = SESSION.get(AMAP_TEXT_API, params=params, timeout=15)
         resp.raise_for_status()
         data = resp.json()
         
@@ -906,7 +975,7 @@ def llm_match_decision(store_row: pd.Series, candidates: List[Dict], is_coord_ca
         "Content-Type": "application/json",
     }
     try:
-        resp = requests.post(url, headers=headers, data=json.dumps(payload), timeout=30)
+        resp = SESSION.post(url, headers=headers, data=json.dumps(payload), timeout=30)
         resp.raise_for_status()
         data = resp.json()
         content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
@@ -946,20 +1015,25 @@ def auto_match(store_row: pd.Series, candidates: List[Dict]) -> Optional[str]:
     city = store_row.get("city", "") or ""
     clean_name = strip_store_suffix(name)
     clean_address = strip_store_suffix(address)
-    for cand in candidates:
-        dist = cand.get("distance", 9999)
-        if dist > 2000:
-            continue
-        target_name = strip_store_suffix(cand.get("name", "") or "")
-        target_address = strip_store_suffix(cand.get("address", "") or "")
-        score_addr = fuzz.token_set_ratio(clean_address, target_address)
-        score_name = fuzz.token_set_ratio(clean_name, target_name)
-        if (province and province not in address) or (city and city not in address):
-            pass
-        if (province and province not in target_address) and (city and city not in target_address):
-            score_addr -= 10
-        if max(score_addr, score_name) >= 80:
-            return cand.get("name")
+    near = [cand for cand in candidates if cand.get("distance", 9999) <= 2000]
+    if not near:
+        return None
+    target_names = [strip_store_suffix(cand.get("name", "") or "") for cand in near]
+    target_addresses = [strip_store_suffix(cand.get("address", "") or "") for cand in near]
+    # 一次 cdist 批量打分，代替逐个候选调用 token_set_ratio
+    score_name = fuzz_process.cdist([clean_name], target_names, scorer=fuzz.token_set_ratio, dtype=np.float64)[0]
+    score_addr = fuzz_process.cdist([clean_address], target_addresses, scorer=fuzz.token_set_ratio, dtype=np.float64)[0]
+    # 候选地址既不含省份也不含城市时，地址分扣 10
+    penalty = np.array(
+        [
+            bool((province and province not in target) and (city and city not in target))
+            for target in target_addresses
+        ]
+    )
+    score_addr = score_addr - 10 * penalty
+    hits = np.flatnonzero(np.maximum(score_addr, score_name) >= 80)
+    if hits.size:
+        return near[int(hits[0])].get("name")
     return None
 
 
@@ -1196,6 +1270,37 @@ def find_nearest_dji_stores(insta_store_row: pd.Series, df: pd.DataFrame, memory
     return nearest_stores[:limit]
 
 
+def find_brand_stores_in_same_mall(brand: str, mall_name: str, city: str, df: pd.DataFrame) -> List[Dict]:
+    """
+    查找指定品牌在同城、同商场（名称相似）的门店
+
+    按列整体取值后再逐个比较商场名，避免 iterrows 为每行构造 Series。
+    """
+    if not mall_name or "mall_name" not in df.columns:
+        return []
+
+    same_city = df[(df["brand"] == brand) & (df["city"] == city)]
+    empty = pd.Series("", index=same_city.index)
+    rows = zip(
+        same_city.index,
+        same_city["mall_name"].map(str).str.strip(),
+        same_city.get("name", empty).map(str),
+        same_city.get("address", empty).map(str),
+    )
+
+    matching_stores = []
+    for idx, store_mall_name, name, address in rows:
+        if store_mall_name and are_mall_names_similar(store_mall_name, mall_name):
+            matching_stores.append({
+                "name": name,
+                "address": address,
+                "mall_name": store_mall_name,
+                "index": idx,  # 保存索引以便后续更新
+            })
+
+    return matching_stores
+
+
 def check_dji_stores_in_same_mall(mall_name: str, city: str, df: pd.DataFrame) -> List[Dict]:
     """
     检查DJI是否有对应商场的门店
@@ -1208,28 +1313,7 @@ def check_dji_stores_in_same_mall(mall_name: str, city: str, df: pd.DataFrame) -
     Returns:
         DJI门店列表，每个元素包含门店信息
     """
-    if not mall_name:
-        return []
-    
-    # 筛选DJI门店
-    dji_stores = df[df["brand"] == "DJI"].copy()
-    
-    # 查找同一城市的DJI门店
-    same_city_dji = dji_stores[dji_stores["city"] == city].copy()
-    
-    # 查找有相同商场名称的DJI门店
-    matching_stores = []
-    for idx, dji_row in same_city_dji.iterrows():  # type: ignore[union-attr]
-        dji_mall_name = str(dji_row.get("mall_name", "")).strip()
-        if dji_mall_name and are_mall_names_similar(dji_mall_name, mall_name):
-            matching_stores.append({
-                "name": str(dji_row.get("name", "")),
-                "address": str(dji_row.get("address", "")),
-                "mall_name": dji_mall_name,
-                "index": idx,  # 保存索引以便后续更新
-            })
-    
-    return matching_stores
+    return find_brand_stores_in_same_mall("DJI", mall_name, city, df)
 
 
 def check_insta_stores_in_same_mall(mall_name: str, city: str, df: pd.DataFrame) -> List[Dict]:
@@ -1244,28 +1328,7 @@ def check_insta_stores_in_same_mall(mall_name: str, city: str, df: pd.DataFrame)
     Returns:
         Insta360门店列表，每个元素包含门店信息
     """
-    if not mall_name:
-        return []
-    
-    # 筛选Insta360门店
-    insta_stores = df[df["brand"] == "Insta360"].copy()
-    
-    # 查找同一城市的Insta360门店
-    same_city_insta = insta_stores[insta_stores["city"] == city].copy()
-    
-    # 查找有相同商场名称的Insta360门店
-    matching_stores = []
-    for idx, insta_row in same_city_insta.iterrows():  # type: ignore[union-attr]
-        insta_mall_name = str(insta_row.get("mall_name", "")).strip()
-        if insta_mall_name and are_mall_names_similar(insta_mall_name, mall_name):
-            matching_stores.append({
-                "name": str(insta_row.get("name", "")),
-                "address": str(insta_row.get("address", "")),
-                "mall_name": insta_mall_name,
-                "index": idx,  # 保存索引以便后续更新
-            })
-    
-    return matching_stores
+    return find_brand_stores_in_same_mall("Insta360", mall_name, city, df)
 
 
 def prompt_same_mall_confirmation(store_row: pd.Series, other_brand_stores: List[Dict], index: int, total: int) -> bool:
@@ -12,12 +12,17 @@
 
 from __future__ import annotations
 
-from math import asin, cos, radians, sin, sqrt
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+try:
+    import numexpr as ne
+except ImportError:  # 无 numexpr 时退回 NumPy 计算
+    ne = None
+
 BASE_DIR = Path(__file__).resolve().parent
 
 MACRO_CSV = BASE_DIR / "商圈数据_Final" / "BusinessArea_Macro_Labels.csv"
@@ -26,6 +31,23 @@ STORE_CSV = BASE_DIR / "各品牌爬虫数据_Final" / "all_brands_offline_store
 # 可选：已有“门店-商场”匹配结果，用于覆盖 mall_id
 STORE_MATCHED_CSV = BASE_DIR / "门店商场匹配结果" / "store_mall_matched.csv"
 
+# 门店表 / store_mall_matched.csv 较宽（含 raw_source 等），只读取匹配用到的列
+STORE_COLS = {
+    "uuid",
+    "brand",
+    "name",
+    "lat",
+    "lng",
+    "province",
+    "city",
+    "district",
+    "province_code",
+    "city_code",
+    "district_code",
+    "mall_id",
+    "is_overseas",
+}
+
 OUT_MACRO_GEO = BASE_DIR / "商圈数据_Final" / "BusinessArea_Macro_WithGeo.csv"
 OUT_UNLINKED = BASE_DIR / "各品牌爬虫数据_Final" / "unlinked_store_macro_matches.csv"
 OUT_ALL_STORES_BA = BASE_DIR / "各品牌爬虫数据_Final" / "all_stores_with_macro_ba.csv"
@@ -39,16 +61,24 @@ ALPHA_MAX = 1.05        # r_max * ALPHA_MAX
 MARGIN = 0.10           # 最终安全余量
 
 
-def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """计算两点之间的大圆距离（km）。"""
-    R = 6371.0
-    lat1_rad, lon1_rad = radians(lat1), radians(lon1)
-    lat2_rad, lon2_rad = radians(lat2), radians(lon2)
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-    a = sin(dlat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlon / 2) ** 2
-    c = 2 * asin(sqrt(a))
-    return R * c
+def haversine_km_many(lat1: float, lon1: float, lat2, lon2) -> np.ndarray:
+    """计算一个点到一组点的大圆距离（km），lat2/lon2 为数组，返回同长度数组。"""
+    lat1_rad, lon1_rad = np.radians(lat1), np.radians(lon1)
+    lat2_rad = np.radians(np.asarray(lat2, dtype=float))
+    lon2_rad = np.radians(np.asarray(lon2, dtype=float))
+    if ne is not None:
+        return ne.evaluate(
+            "2 * 6371.0 * arcsin(sqrt(sin((lat2_rad - lat1_rad) / 2) ** 2"
+            " + cos(lat1_rad) * cos(lat2_rad) * sin((lon2_rad - lon1_rad) / 2) ** 2))",
+            local_dict={
+                "lat1_rad": lat1_rad,
+                "lon1_rad": lon1_rad,
+                "lat2_rad": lat2_rad,
+                "lon2_rad": lon2_rad,
+            },
+        )
+    a = np.sin((lat2_rad - lat1_rad) / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin((lon2_rad - lon1_rad) / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(a))
 
 
 def norm_code(val) -> Optional[str]:
@@ -65,15 +95,20 @@ def norm_code(val) -> Optional[str]:
     return s.zfill(6) if len(s) < 6 else s
 
 
+def cn_with_coords_mask(df: pd.DataFrame) -> pd.Series:
+    """中国区（is_overseas 为 0 或空）且有坐标的行掩码，一次性合并三个条件。"""
+    return (df["is_overseas"].fillna(0) == 0) & df["lat"].notna() & df["lng"].notna()
+
+
 def load_mall_index() -> Dict[str, Tuple[float, float]]:
-    df = pd.read_csv(MALL_CSV, encoding="utf-8-sig")
-    index: Dict[str, Tuple[float, float]] = {}
-    for _, row in df.iterrows():
-        code = str(row.get("mall_code") or "").strip()
-        lat = row.get("lat")
-        lng = row.get("lng")
-        if code and pd.notna(lat) and pd.notna(lng):
-            index[code] = (float(lat), float(lng))
+    df = pd.read_csv(
+        MALL_CSV, encoding="utf-8-sig", usecols=["mall_code", "lat", "lng"], dtype={"mall_code": str}
+    )
+    codes = df["mall_code"].fillna("").astype(str).str.strip()
+    valid = (codes != "") & df["lat"].notna() & df["lng"].notna()
+    index: Dict[str, Tuple[float, float]] = dict(
+        zip(codes[valid], zip(df.loc[valid, "lat"].astype(float), df.loc[valid, "lng"].astype(float)))
+    )
     if not index:
         raise RuntimeError("商场表未找到任何有效坐标")
     return index
@@ -83,18 +118,15 @@ def compute_centroid_and_radius(points: List[Tuple[float, float]]) -> Tuple[floa
     """给定一组点，返回 (center_lat, center_lng, radius_km, r_max)."""
     if not points:
         return float("nan"), float("nan"), float("nan"), float("nan")
-    lats = [p[0] for p in points]
-    lngs = [p[1] for p in points]
-    center_lat = sum(lats) / len(lats)
-    center_lng = sum(lngs) / len(lngs)
-
-    # 计算到质心的距离统计
-    dists = [haversine_km(lat, lng, center_lat, center_lng) for lat, lng in points]
-    r_mean = sum(dists) / len(dists)
-    # 方差/标准差
-    variance = sum((d - r_mean) ** 2 for d in dists) / len(dists)
-    r_std = variance ** 0.5
-    r_max = max(dists)
+    coords = np.asarray(points, dtype=float)
+    center_lat = float(coords[:, 0].mean())
+    center_lng = float(coords[:, 1].mean())
+
+    # 计算到质心的距离统计（总体标准差）
+    dists = haversine_km_many(center_lat, center_lng, coords[:, 0], coords[:, 1])
+    r_mean = float(dists.mean())
+    r_std = float(dists.std())
+    r_max = float(dists.max())
 
     radius = max(r_mean + STD_K * r_std, r_max * ALPHA_MAX, MIN_RADIUS_KM)
     radius = radius * (1 + MARGIN)
@@ -104,13 +136,13 @@ def compute_centroid_and_radius(points: List[Tuple[float, float]]) -> Tuple[floa
 
 def enrich_macro_geo(macro_df: pd.DataFrame, mall_index: Dict[str, Tuple[float, float]]) -> pd.DataFrame:
     rows = []
-    for _, row in macro_df.iterrows():
+    for row in macro_df.to_dict("records"):
         mall_codes = str(row.get("mall_codes") or "").split("|")
         pts = [mall_index[mc] for mc in mall_codes if mc in mall_index]
         center_lat, center_lng, radius_km, r_max = compute_centroid_and_radius(pts)
         rows.append(
             {
-                **row.to_dict(),
+                **row,
                 "center_lat": center_lat,
                 "center_lng": center_lng,
                 "radius_km": radius_km,
@@ -140,74 +172,101 @@ def build_area_index(area_df: pd.DataFrame) -> Tuple[Dict[str, List[dict]], Dict
 
 
 def match_unlinked_stores(area_df: pd.DataFrame, store_df: pd.DataFrame) -> pd.DataFrame:
-    stores = store_df.copy()
     # 仅中国区 & 有坐标 & 未关联商场
-    stores = stores[(stores["is_overseas"] == 0) | (stores["is_overseas"].isna())]
-    stores = stores[stores["lat"].notna() & stores["lng"].notna()]
+    stores = store_df.loc[cn_with_coords_mask(store_df)].copy()
     stores["district_code_norm"] = stores["district_code"].apply(norm_code)
     stores["city_code_norm"] = stores["city_code"].apply(norm_code)
     unlinked = stores[stores["mall_id"].isna()]
 
     by_district, by_city = build_area_index(area_df)
 
-    matched_rows = []
-    for _, row in unlinked.iterrows():
-        lat_s, lng_s = float(row["lat"]), float(row["lng"])
-        candidates = None
-        dist_code = row.get("district_code_norm")
-        city_code = row.get("city_code_norm")
+    # 候选商圈按 (层级, code) 缓存为数组，避免每个门店重复过滤/取值
+    bucket_cache: Dict[Tuple[str, str], Tuple[List[dict], np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def get_bucket(level: str, code: str, areas: List[dict]):
+        key = (level, code)
+        if key not in bucket_cache:
+            valid = [
+                a
+                for a in areas
+                if pd.notna(a.get("center_lat")) and pd.notna(a.get("center_lng")) and pd.notna(a.get("radius_km"))
+            ]
+            bucket_cache[key] = (
+                valid,
+                np.array([a["center_lat"] for a in valid], dtype=float),
+                np.array([a["center_lng"] for a in valid], dtype=float),
+                np.array([a["radius_km"] for a in valid], dtype=float),
+            )
+        return bucket_cache[key]
+
+    # 按列累积匹配结果（行位置 + 商圈字段），最后一次性组装 DataFrame
+    hit_positions: List[int] = []
+    hit_cols: Dict[str, list] = {
+        "business_area_key": [],
+        "business_area_name": [],
+        "area_id_local": [],
+        "distance_km": [],
+        "radius_km": [],
+    }
+    store_iter = zip(
+        unlinked["lat"].astype(float),
+        unlinked["lng"].astype(float),
+        unlinked["district_code_norm"],
+        unlinked["city_code_norm"],
+    )
+    for pos, (lat_s, lng_s, dist_code, city_code) in enumerate(store_iter):
         if dist_code and dist_code in by_district:
-            candidates = by_district[dist_code]
+            areas, clats, clngs, radii = get_bucket("district", dist_code, by_district[dist_code])
         elif city_code and city_code in by_city:
-            candidates = by_city[city_code]
+            areas, clats, clngs, radii = get_bucket("city", city_code, by_city[city_code])
         else:
             continue  # 无候选，跳过
 
-        best = None
-        for area in candidates:
-            clat = area.get("center_lat")
-            clng = area.get("center_lng")
-            radius_km = area.get("radius_km")
-            if pd.isna(clat) or pd.isna(clng) or pd.isna(radius_km):
-                continue
-            dist_km = haversine_km(lat_s, lng_s, clat, clng)
-            if dist_km <= radius_km:
-                if best is None or dist_km < best[1]:
-                    best = (area, dist_km)
-
-        if best is None:
+        if not areas:
+            continue
+        dists = haversine_km_many(lat_s, lng_s, clats, clngs)
+        within = dists <= radii
+        if not within.any():
             continue
+        best_pos = int(np.argmin(np.where(within, dists, np.inf)))
+        area = areas[best_pos]
+
+        hit_positions.append(pos)
+        hit_cols["business_area_key"].append(area.get("business_area_key"))
+        hit_cols["business_area_name"].append(area.get("area_name"))
+        hit_cols["area_id_local"].append(area.get("area_id_local"))
+        hit_cols["distance_km"].append(float(dists[best_pos]))
+        hit_cols["radius_km"].append(area.get("radius_km"))
+
+    hits = unlinked.iloc[hit_positions]
+    out = hits.reindex(columns=["uuid", "brand", "name", "lat", "lng", "province", "city", "district"])
+    out = out.reset_index(drop=True)
+    out["lat"] = out["lat"].astype(float)
+    out["lng"] = out["lng"].astype(float)
+    out["province_code"] = (
+        hits["province_code"].map(norm_code).to_numpy() if "province_code" in hits.columns else None
+    )
+    out["city_code"] = hits["city_code_norm"].to_numpy()
+    out["district_code"] = hits["district_code_norm"].to_numpy()
+    for col, values in hit_cols.items():
+        out[col] = values
+    return out
 
-        area, dist_km = best
-        matched_rows.append(
-            {
-                "uuid": row.get("uuid"),
-                "brand": row.get("brand"),
-                "name": row.get("name"),
-                "lat": lat_s,
-                "lng": lng_s,
-                "province": row.get("province"),
-                "city": row.get("city"),
-                "district": row.get("district"),
-                "province_code": norm_code(row.get("province_code")),
-                "city_code": norm_code(row.get("city_code")),
-                "district_code": norm_code(row.get("district_code")),
-                "business_area_key": area.get("business_area_key"),
-                "business_area_name": area.get("area_name"),
-                "area_id_local": area.get("area_id_local"),
-                "distance_km": dist_km,
-                "radius_km": area.get("radius_km"),
-            }
-        )
 
-    return pd.DataFrame(matched_rows)
+def read_store_matched() -> pd.DataFrame:
+    return pd.read_csv(
+        STORE_MATCHED_CSV,
+        encoding="utf-8-sig",
+        usecols=lambda c: c in STORE_COLS,
+        dtype={"mall_id": str},
+    )
 
 
 def overlay_mall_matches(store_df: pd.DataFrame) -> pd.DataFrame:
     """若存在外部 mall 匹配结果，用其补全 mall_id。"""
     if not STORE_MATCHED_CSV.exists():
         return store_df
-    matched_df = pd.read_csv(STORE_MATCHED_CSV, encoding="utf-8-sig")
+    matched_df = read_store_matched()
     if "uuid" not in matched_df.columns or "mall_id" not in matched_df.columns:
         return store_df
     match_map = (
@@ -246,38 +305,21 @@ def build_all_store_ba(
     # 1) 已有关联商场的门店（来源：store_mall_matched.csv 覆盖后的 store_df）
     mall_link_df = pd.DataFrame()
     if STORE_MATCHED_CSV.exists():
-        smm = pd.read_csv(STORE_MATCHED_CSV, encoding="utf-8-sig")
-        smm = smm[(smm["is_overseas"] == 0) | (smm["is_overseas"].isna())]
-        smm = smm[smm["lat"].notna() & smm["lng"].notna()]
-        records = []
-        for _, row in smm.iterrows():
-            mall_id = str(row.get("mall_id") or "").strip()
-            ba_key, ba_name, area_id_local = (None, None, None)
-            if mall_id and mall_id in mall_map:
-                ba_key, ba_name, area_id_local = mall_map[mall_id]
-            records.append(
-                {
-                    "uuid": row.get("uuid"),
-                    "brand": row.get("brand"),
-                    "name": row.get("name"),
-                    "lat": row.get("lat"),
-                    "lng": row.get("lng"),
-                    "province": row.get("province"),
-                    "city": row.get("city"),
-                    "district": row.get("district"),
-                    "province_code": norm_code(row.get("province_code")),
-                    "city_code": norm_code(row.get("city_code")),
-                    "district_code": norm_code(row.get("district_code")),
-                    "mall_id": mall_id if mall_id else None,
-                    "business_area_key": ba_key,
-                    "business_area_name": ba_name,
-                    "area_id_local": area_id_local,
-                    "match_source": "mall_link",
-                    "distance_km": None,
-                    "radius_km": None,
-                }
-            )
-        mall_link_df = pd.DataFrame(records)
+        smm = read_store_matched()
+        smm = smm.loc[cn_with_coords_mask(smm)].reset_index(drop=True)
+        # 整列映射 mall_id -> 商圈，替代逐行 iterrows
+        mall_ids = smm["mall_id"].fillna("").astype(str).str.strip()
+        mall_link_df = smm.reindex(columns=["uuid", "brand", "name", "lat", "lng", "province", "city", "district"])
+        for col in ("province_code", "city_code", "district_code"):
+            mall_link_df[col] = smm[col].map(norm_code) if col in smm.columns else None
+        mall_link_df["mall_id"] = mall_ids.where(mall_ids != "", None)
+        ba_cols = ["business_area_key", "business_area_name", "area_id_local"]
+        ba_df = pd.DataFrame.from_dict(mall_map, orient="index", columns=ba_cols).reindex(mall_ids)
+        for col in ba_cols:
+            mall_link_df[col] = ba_df[col].to_numpy()
+        mall_link_df["match_source"] = "mall_link"
+        mall_link_df["distance_km"] = None
+        mall_link_df["radius_km"] = None
 
     # 2) 未关联商场但经纬度匹配商圈的门店
     geo_df = matches_df.copy()
@@ -326,7 +368,7 @@ def main() -> None:
     print(f"[信息] 读取商场: {MALL_CSV}")
     mall_index = load_mall_index()
     print(f"[信息] 读取门店: {STORE_CSV}")
-    store_df = pd.read_csv(STORE_CSV, encoding="utf-8-sig")
+    store_df = pd.read_csv(STORE_CSV, encoding="utf-8-sig", usecols=lambda c: c in STORE_COLS)
     store_df = overlay_mall_matches(store_df)
 
     print("[信息] 计算商圈中心点与动态半径...")
@@ -346,7 +388,7 @@ def main() -> None:
     all_df.to_csv(OUT_ALL_STORES_BA, index=False, encoding="utf-8-sig")
 
     # 统计：仅中国区 & 未关联商场
-    mask_cn = (store_df["is_overseas"] == 0) | (store_df["is_overseas"].isna())
+    mask_cn = store_df["is_overseas"].fillna(0) == 0
     mask_unlinked = store_df["mall_id"].isna()
     total_cn = int(store_df.loc[mask_cn].shape[0])
     total_unlinked = int(store_df.loc[mask_cn & mask_unlinked].shape[0])
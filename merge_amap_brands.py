@@ -168,7 +168,6 @@ def parse_poi(poi: dict, brand: str) -> dict:
         "source": "amap_keyword",
         "store_type_raw": poi.get("type"),
         "store_type_std": "brand_store",
-        "raw_source": json.dumps(poi, ensure_ascii=False),
     }
 
 
@@ -191,6 +190,7 @@ def merge_brand(brand: str, keywords: List[str], input_dir: Path, output_dir: Pa
 
     seen_keys = set(base_df["__key"])
     new_rows: List[dict] = []
+    new_pois: List[dict] = []
     for kw in keywords:
         pois = client.text_search(kw)
         for lng, lat, _city in CITY_CENTERS:
@@ -202,13 +202,27 @@ def merge_brand(brand: str, keywords: List[str], input_dir: Path, output_dir: Pa
                 continue
             seen_keys.add(key)
             new_rows.append(row)
+            new_pois.append(poi)
 
     add_df = pd.DataFrame(new_rows)
-    merged = pd.concat([base_df.drop(columns=["__key"], errors="ignore"), add_df], ignore_index=True)
+    # raw_source 只为去重后保留的 POI 序列化，且集中在循环外一次完成
+    add_df["raw_source"] = [json.dumps(poi, ensure_ascii=False) for poi in new_pois]
+    base_out = base_df.drop(columns=["__key"], errors="ignore")
     output_dir.mkdir(parents=True, exist_ok=True)
     out_path = output_dir / base_path.name
-    merged.to_csv(out_path, index=False, encoding="utf-8-sig")
-    return len(base_df), len(add_df), len(merged)
+    if base_out.empty or not set(add_df.columns) <= set(base_out.columns):
+        # 新增列不在原表头中时退回 concat，由 pandas 对齐表头
+        merged = pd.concat([base_out, add_df], ignore_index=True)
+        merged.to_csv(out_path, index=False, encoding="utf-8-sig")
+        return len(base_df), len(add_df), len(merged)
+
+    # 原表只写一次，新增行按原表头顺序追加，省去整表 concat 拷贝
+    base_out.to_csv(out_path, index=False, encoding="utf-8-sig")
+    if not add_df.empty:
+        add_df.reindex(columns=base_out.columns).to_csv(
+            out_path, mode="a", header=False, index=False, encoding="utf-8"
+        )
+    return len(base_df), len(add_df), len(base_df) + len(add_df)
 
 
 def main() -> None:
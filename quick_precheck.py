@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import importlib.util
 import sys
 from pathlib import Path
 from typing import List
 
+import numpy as np
 import pandas as pd
 
+# 装有 pyarrow 时用其多线程解析器读 CSV，否则使用默认 C 解析器
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
+
 BASE = Path(__file__).resolve().parent
 ALL_CSV = BASE / "all_stores_final.csv"
 MASTER_CSV = BASE / "Store_Master_Cleaned.csv"
@@ -21,20 +26,31 @@ def fail(msg: str) -> None:
     sys.exit(1)
 
 
+def read_checked_columns(path: Path) -> pd.DataFrame:
+    """只读取体检涉及的列；缺失的必需列留给 check_required 报告。"""
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in header if c in REQUIRED_COLS]
+    return pd.read_csv(path, usecols=usecols, engine=CSV_ENGINE)
+
+
 def check_required(df: pd.DataFrame, name: str) -> List[str]:
     missing_cols = [c for c in REQUIRED_COLS if c not in df.columns]
     if missing_cols:
         fail(f"{name} 缺少必需列: {missing_cols}")
 
-    missing_rows = df[df[REQUIRED_COLS].isnull().any(axis=1)]
-    if not missing_rows.empty:
-        fail(f"{name} 存在必填为空的行: {len(missing_rows)} 条")
+    missing_count = int(df[REQUIRED_COLS].isnull().any(axis=1).sum())
+    if missing_count:
+        fail(f"{name} 存在必填为空的行: {missing_count} 条")
     return missing_cols
 
 
 def check_duplicates(df: pd.DataFrame) -> None:
     key_cols = ["brand", "name", "address"]
-    dup = df[key_cols].astype(str).apply(lambda s: s.str.strip()).duplicated(keep=False)
+    # 拼成单列键后一次哈希去重，避免逐列 apply
+    keys = df[key_cols[0]].fillna("").astype(str).str.strip()
+    for col in key_cols[1:]:
+        keys = keys + "\x1f" + df[col].fillna("").astype(str).str.strip()
+    dup = keys.duplicated(keep=False).to_numpy()
     dup_count = dup.sum()
     if dup_count:
         sample = df.loc[dup, key_cols].head(5).to_dict(orient="records")
@@ -42,13 +58,16 @@ def check_duplicates(df: pd.DataFrame) -> None:
 
 
 def check_coords(df: pd.DataFrame, name: str) -> None:
-    lat = pd.to_numeric(df["lat"], errors="coerce")
-    lng = pd.to_numeric(df["lng"], errors="coerce")
-    out_of_range = (
-        (lat < COORD_BOUNDS["lat_min"])
-        | (lat > COORD_BOUNDS["lat_max"])
-        | (lng < COORD_BOUNDS["lng_min"])
-        | (lng > COORD_BOUNDS["lng_max"])
+    lat = pd.to_numeric(df["lat"], errors="coerce").to_numpy(dtype=float)
+    lng = pd.to_numeric(df["lng"], errors="coerce").to_numpy(dtype=float)
+    # 直接在 NumPy 数组上比较；NaN 比较结果为 False，不计为越界
+    out_of_range = np.logical_or.reduce(
+        [
+            lat < COORD_BOUNDS["lat_min"],
+            lat > COORD_BOUNDS["lat_max"],
+            lng < COORD_BOUNDS["lng_min"],
+            lng > COORD_BOUNDS["lng_max"],
+        ]
     )
     if out_of_range.any():
         sample = df.loc[out_of_range, ["name", "city", "lat", "lng"]].head(5).to_dict(orient="records")
@@ -58,13 +77,13 @@ def check_coords(df: pd.DataFrame, name: str) -> None:
 def main() -> None:
     if not ALL_CSV.exists():
         fail(f"缺少 {ALL_CSV.name}")
-    df_all = pd.read_csv(ALL_CSV)
+    df_all = read_checked_columns(ALL_CSV)
     check_required(df_all, ALL_CSV.name)
     check_duplicates(df_all)
     check_coords(df_all, ALL_CSV.name)
 
     if MASTER_CSV.exists():
-        df_master = pd.read_csv(MASTER_CSV)
+        df_master = read_checked_columns(MASTER_CSV)
         check_required(df_master, MASTER_CSV.name)
         check_coords(df_master, MASTER_CSV.name)
 
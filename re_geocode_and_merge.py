@@ -11,20 +11,44 @@
 from __future__ import annotations
 
 import argparse
-import json
+import importlib.util
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
 import pandas as pd
-import requests
 
-CN_LNG_RANGE = (70.0, 140.0)
-CN_LAT_RANGE = (0.0, 60.0)
+from amap_utils import (
+    AMAP_QPS,
+    RateLimiter,
+    cache_entry,
+    create_session,
+    load_json_cache,
+    save_json_cache,
+)
 
+# 装有 pyarrow 时用其多线程解析器读 CSV，否则使用默认 C 解析器
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
 
+CN_LNG_RANGE = (70.0, 140.0)
+CN_LAT_RANGE = (0.0, 60.0)
+# 合并中国区表时使用更紧的矩形
+MERGE_LNG_RANGE = (72.0, 135.5)
+MERGE_LAT_RANGE = (0.5, 55.9)
+MAX_WORKERS = 8
+# 同时处理的品牌文件数：一个文件读写 CSV 时，另一个文件的 geocode 请求继续进行
+FILE_WORKERS = 2
+BASE_DIR = Path(__file__).resolve().parent
+GEOCODE_CACHE_PATH = BASE_DIR / "logs" / "amap_geocode_cache.json"
+# 磁盘缓存条目带写入时间戳，超过该天数视为未命中并重新请求（含“无结果”的 None）
+CACHE_TTL_DAYS = 90
+
+
+@lru_cache(maxsize=1)
 def load_amap_key() -> Optional[str]:
+    """读取高德 Key（环境变量优先，其次 .env.local），进程内只解析一次"""
     key = os.getenv("AMAP_WEB_KEY")
     if key:
         return key
@@ -42,20 +66,38 @@ def load_amap_key() -> Optional[str]:
 
 
 class AMapGeocoder:
-    def __init__(self, api_key: str, pause: float = 0.1):
+    def __init__(
+        self,
+        api_key: str,
+        qps: float = AMAP_QPS,
+        pool_size: int = MAX_WORKERS,
+        cache_path: Optional[Path] = None,
+        ttl_days: float = CACHE_TTL_DAYS,
+    ):
         self.api_key = api_key
-        self.pause = pause
-        self.session = requests.Session()
+        self.session = create_session(pool_connections=pool_size, pool_maxsize=pool_size)
         self.session.headers.update({"User-Agent": "re-geocode/0.1"})
-        self.cache: Dict[Tuple[str, str], Optional[dict]] = {}
+        # 缓存键为 "address|city"，值为 cache_entry() 条目；cache_path 为空时仅在进程内缓存。
+        # 超过 ttl_days 的条目与旧格式条目加载时丢弃
+        self.cache_path = cache_path
+        self.cache: Dict[str, dict] = (
+            load_json_cache(cache_path, max_age=ttl_days * 86400) if cache_path else {}
+        )
+        self._loaded = len(self.cache)
+        # 网络错误、配额等失败与空结果只在本次运行内跳过，不写入磁盘
+        self._transient: set = set()
+        # 多线程共用的限速：总请求速率不超过 qps
+        self._limiter = RateLimiter(qps)
 
     def geocode(self, address: str, city: str | None = None) -> Optional[dict]:
-        key = (address, city or "")
-        if key in self.cache:
-            return self.cache[key]
+        key = f"{address}|{city or ''}"
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry["result"]
         params = {"key": self.api_key, "address": address}
         if city:
             params["city"] = city
+        self._limiter.acquire()
         try:
             resp = self.session.get(
                 "https://restapi.amap.com/v3/geocode/geo", params=params, timeout=12
@@ -63,84 +105,113 @@ class AMapGeocoder:
             resp.raise_for_status()
             data = resp.json()
         except Exception:
-            self.cache[key] = None
+            self._transient.add(key)
+            self.cache[key] = cache_entry(None)
             return None
         if data.get("status") != "1":
-            self.cache[key] = None
+            self._transient.add(key)
+            self.cache[key] = cache_entry(None)
             return None
         geos = data.get("geocodes") or []
         if not geos:
-            self.cache[key] = None
+            self._transient.add(key)
+            self.cache[key] = cache_entry(None)
             return None
-        self.cache[key] = geos[0]
-        time.sleep(self.pause)
+        self.cache[key] = cache_entry(geos[0])
         return geos[0]
 
+    def save_cache(self) -> None:
+        """写回有新增确定结果的磁盘缓存"""
+        if self.cache_path is None or len(self.cache) - len(self._transient) == self._loaded:
+            return
+        data = {k: v for k, v in self.cache.items() if k not in self._transient}
+        save_json_cache(self.cache_path, data)
+
+
+def valid_cn_mask(
+    df: pd.DataFrame,
+    lat_range: Tuple[float, float] = CN_LAT_RANGE,
+    lng_range: Tuple[float, float] = CN_LNG_RANGE,
+) -> pd.Series:
+    """lat/lng 均为数值且落在给定矩形内的行为 True；缺列或非数值视为无效。"""
+    if "lat" not in df.columns or "lng" not in df.columns:
+        return pd.Series(False, index=df.index)
+    lat = pd.to_numeric(df["lat"], errors="coerce")
+    lng = pd.to_numeric(df["lng"], errors="coerce")
+    return lat.between(*lat_range) & lng.between(*lng_range)
+
+
+def adcode_levels(adcodes: pd.Series) -> pd.DataFrame:
+    """把 6 位 adcode 拆成省/市/区三级代码，非法值对应 NaN。"""
+    adcodes = adcodes.where(adcodes.str.fullmatch(r"\d{6}").eq(True))
+    return pd.DataFrame(
+        {
+            "province_code": adcodes.str[:2] + "0000",
+            "city_code": adcodes.str[:4] + "00",
+            "district_code": adcodes,
+        }
+    )
 
-def adcode_to_levels(adcode: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-    if not adcode or len(adcode) != 6 or not adcode.isdigit():
-        return None, None, None
-    prov = adcode[:2] + "0000"
-    city = adcode[:4] + "00"
-    dist = adcode
-    return prov, city, dist
 
+def fill_blank(df: pd.DataFrame, col: str, values: pd.Series) -> None:
+    """仅在 df[col] 为空（NaN 或空白字符串）的行写入 values，按索引对齐。"""
+    if col not in df.columns:
+        return
+    current = df.loc[values.index, col]
+    blank = current.isna() | current.astype(str).str.strip().eq("")
+    df.loc[blank.index[blank], col] = values[blank]
 
-def is_valid_cn_coord(lat: float, lng: float) -> bool:
-    return (
-        lat is not None
-        and lng is not None
-        and CN_LAT_RANGE[0] <= lat <= CN_LAT_RANGE[1]
-        and CN_LNG_RANGE[0] <= lng <= CN_LNG_RANGE[1]
-    )
 
+QUERY_FIELDS = ["address_std", "address", "address_raw", "name"]
+CITY_FIELDS = ["city", "province"]
+REFRESH_SOURCE = "amap_geocode_refresh"
 
-def safe_float(val) -> Optional[float]:
-    try:
-        if pd.isna(val):
-            return None
-        return float(val)
-    except Exception:
-        return None
 
+def text_or_none(value) -> Optional[str]:
+    return value if isinstance(value, str) else None
 
-def row_query(df: pd.DataFrame, idx) -> Tuple[str, Optional[str]]:
-    fields = [
-        df.at[idx, f]
-        for f in ["address_std", "address", "address_raw", "name"]
-        if f in df.columns
-    ]
-    query = ""
-    for v in fields:
+
+def first_text(values) -> Optional[str]:
+    for v in values:
         if isinstance(v, str) and v.strip():
-            query = v.strip()
-            break
-    city = None
-    if "city" in df.columns and isinstance(df.at[idx, "city"], str) and df.at[idx, "city"].strip():
-        city = df.at[idx, "city"].strip()
-    elif "province" in df.columns and isinstance(df.at[idx, "province"], str) and df.at[idx, "province"].strip():
-        city = df.at[idx, "province"].strip()
+            return v.strip()
+    return None
+
+
+def row_query(row) -> Tuple[str, Optional[str]]:
+    """row 为 itertuples 产出的命名元组，缺失的列按 None 处理。"""
+    query = first_text(getattr(row, f, None) for f in QUERY_FIELDS) or ""
+    city = first_text(getattr(row, f, None) for f in CITY_FIELDS)
     return query, city
 
 
-def process_file(path: Path, out_dir: Path, geocoder: AMapGeocoder) -> dict:
+def process_file(
+    path: Path, out_dir: Path, geocoder: AMapGeocoder, max_workers: int = MAX_WORKERS
+) -> dict:
     df = pd.read_csv(path)
     if df.empty:
         return {"brand": path.stem, "rows": 0, "geocoded": 0}
 
     brand = df.get("brand", pd.Series([path.stem])).iloc[0]
-    geocoded = 0
 
-    for idx in df.index:
-        lat = safe_float(df.at[idx, "lat"]) if "lat" in df.columns else None
-        lng = safe_float(df.at[idx, "lng"]) if "lng" in df.columns else None
-        need_geo = not is_valid_cn_coord(lat, lng)
-        if not need_geo:
-            continue
-        query, city = row_query(df, idx)
-        if not query:
-            continue
-        result = geocoder.geocode(query, city)
+    # 一次性算出需要重新 geocode 的行：缺失、非数值或不在中国范围
+    bad = ~valid_cn_mask(df)
+
+    needed = [c for c in QUERY_FIELDS + CITY_FIELDS if c in df.columns]
+    queries = []
+    for row in df.loc[bad, needed].itertuples():
+        query, city = row_query(row)
+        if query:
+            queries.append((row.Index, query, city))
+    # 同一地址（如同一商场内的多家门店）只请求一次，结果按 (query, city) 回填到各行。
+    # 高德请求是纯网络等待，多线程并发，节奏由 geocoder 的限速控制
+    pairs = list(dict.fromkeys((query, city) for _, query, city in queries))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        answers = dict(zip(pairs, executor.map(lambda p: geocoder.geocode(*p), pairs)))
+
+    records = []
+    for idx, query, city in queries:
+        result = answers[(query, city)]
         if not result or not result.get("location"):
             continue
         try:
@@ -149,30 +220,37 @@ def process_file(path: Path, out_dir: Path, geocoder: AMapGeocoder) -> dict:
             lng_new = float(lng_str)
         except Exception:
             continue
-        df.at[idx, "lat"] = lat_new
-        df.at[idx, "lng"] = lng_new
-        df.at[idx, "lat_gcj02"] = lat_new
-        df.at[idx, "lng_gcj02"] = lng_new
-        df.at[idx, "coord_system"] = "gcj02"
-        df.at[idx, "coord_source"] = "amap_geocode_refresh"
-        if "source" in df.columns and (pd.isna(df.at[idx, "source"]) or not str(df.at[idx, "source"]).strip()):
-            df.at[idx, "source"] = "amap_geocode_refresh"
-        # 填充行政区
-        if "province" in df.columns and (pd.isna(df.at[idx, "province"]) or not str(df.at[idx, "province"]).strip()):
-            df.at[idx, "province"] = result.get("province")
-        if "city" in df.columns and (pd.isna(df.at[idx, "city"]) or not str(df.at[idx, "city"]).strip()):
-            df.at[idx, "city"] = result.get("city") or result.get("province")
-        if "district" in df.columns and (pd.isna(df.at[idx, "district"]) or not str(df.at[idx, "district"]).strip()):
-            df.at[idx, "district"] = result.get("district")
-        adcode = result.get("adcode")
-        prov_code, city_code, dist_code = adcode_to_levels(adcode) if adcode else (None, None, None)
-        if "province_code" in df.columns and (pd.isna(df.at[idx, "province_code"]) or not str(df.at[idx, "province_code"]).strip()):
-            df.at[idx, "province_code"] = prov_code
-        if "city_code" in df.columns and (pd.isna(df.at[idx, "city_code"]) or not str(df.at[idx, "city_code"]).strip()):
-            df.at[idx, "city_code"] = city_code
-        if "district_code" in df.columns and (pd.isna(df.at[idx, "district_code"]) or not str(df.at[idx, "district_code"]).strip()):
-            df.at[idx, "district_code"] = dist_code
-        geocoded += 1
+        # 高德缺省字段返回 []，统一按 None 处理
+        province = text_or_none(result.get("province"))
+        records.append(
+            {
+                "idx": idx,
+                "lat": lat_new,
+                "lng": lng_new,
+                "province": province,
+                "city": text_or_none(result.get("city")) or province,
+                "district": text_or_none(result.get("district")),
+                "adcode": text_or_none(result.get("adcode")),
+            }
+        )
+
+    geocoded = len(records)
+    if geocoded:
+        upd = pd.DataFrame(records).set_index("idx")
+        # 覆盖类字段按索引整列回写
+        df.loc[upd.index, "lat"] = upd["lat"]
+        df.loc[upd.index, "lng"] = upd["lng"]
+        df.loc[upd.index, "lat_gcj02"] = upd["lat"]
+        df.loc[upd.index, "lng_gcj02"] = upd["lng"]
+        df.loc[upd.index, "coord_system"] = "gcj02"
+        df.loc[upd.index, "coord_source"] = REFRESH_SOURCE
+        # 来源与行政区仅填补空值；行政区代码由 adcode 整列切片得到
+        fill_blank(df, "source", pd.Series(REFRESH_SOURCE, index=upd.index))
+        for col in ("province", "city", "district"):
+            fill_blank(df, col, upd[col])
+        levels = adcode_levels(upd["adcode"].astype(object))
+        for col in levels.columns:
+            fill_blank(df, col, levels[col])
 
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / path.name
@@ -183,13 +261,10 @@ def process_file(path: Path, out_dir: Path, geocoder: AMapGeocoder) -> dict:
 def merge_cn(out_dir: Path) -> int:
     rows = []
     for path in out_dir.glob("*_offline_stores.csv"):
-        df = pd.read_csv(path)
+        df = pd.read_csv(path, engine=CSV_ENGINE)
         if df.empty:
             continue
-        lat = pd.to_numeric(df.get("lat"), errors="coerce")
-        lng = pd.to_numeric(df.get("lng"), errors="coerce")
-        mask = lat.between(0.5, 55.9) & lng.between(72.0, 135.5)
-        rows.append(df[mask])
+        rows.append(df[valid_cn_mask(df, MERGE_LAT_RANGE, MERGE_LNG_RANGE)])
     if not rows:
         return 0
     all_df = pd.concat(rows, ignore_index=True)
@@ -210,18 +285,43 @@ def main() -> None:
         default="各品牌爬虫数据_enriched_geo_refreshed",
         help="输出目录（不会覆盖原文件）",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"并发 geocode 线程数（默认 {MAX_WORKERS}）",
+    )
+    parser.add_argument(
+        "--cache",
+        default=str(GEOCODE_CACHE_PATH),
+        help="geocode 结果缓存文件，重复运行时复用（传空字符串禁用）",
+    )
     args = parser.parse_args()
 
     api_key = load_amap_key()
     if not api_key:
         raise RuntimeError("未找到 AMAP_WEB_KEY")
-    geocoder = AMapGeocoder(api_key)
+    cache_path = Path(args.cache) if args.cache else None
+    geocoder = AMapGeocoder(
+        api_key, pool_size=args.workers * FILE_WORKERS, cache_path=cache_path
+    )
 
-    summaries = []
-    for path in sorted(Path(args.input_dir).glob("*_offline_stores.csv")):
-        if path.name.startswith("AMap_"):
-            continue
-        summaries.append(process_file(path, Path(args.output_dir), geocoder))
+    paths = [
+        path
+        for path in sorted(Path(args.input_dir).glob("*_offline_stores.csv"))
+        if not path.name.startswith("AMap_")
+    ]
+    # 各文件共用同一个 geocoder，限速在所有线程间生效；map 保持文件顺序
+    try:
+        with ThreadPoolExecutor(max_workers=FILE_WORKERS) as executor:
+            summaries = list(
+                executor.map(
+                    lambda path: process_file(path, Path(args.output_dir), geocoder, args.workers),
+                    paths,
+                )
+            )
+    finally:
+        geocoder.save_cache()
 
     print("brand,rows,geocoded")
     for s in summaries:
@@ -2,62 +2,52 @@
 
 from __future__ import annotations
 
+import argparse
 import csv
-import os
+import importlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
-
-from spiders.apple_offline_store_spider import AppleOfflineStoreSpider
-from spiders.dji_offline_store_spider import DJIOfflineStoreSpider
-from spiders.huawei_offline_store_spider import HuaweiOfflineStoreSpider
-from spiders.honor_offline_store_spider import HonorOfflineStoreSpider
-from spiders.insta360_offline_store_spider import Insta360OfflineStoreSpider
-from spiders.arcteryx_offline_store_spider import ArcteryxOfflineStoreSpider
-from spiders.nio_offline_store_spider import NioOfflineStoreSpider
-from spiders.coach_offline_store_spider import CoachOfflineStoreSpider
-from spiders.hermes_offline_store_spider import HermesOfflineStoreSpider
-from spiders.oppo_offline_store_spider import OppoOfflineStoreSpider
-from spiders.popmart_offline_store_spider import PopmartOfflineStoreSpider
-from spiders.samsung_offline_store_spider import SamsungOfflineStoreSpider
-from spiders.on_offline_store_spider import OnOfflineStoreSpider
-from spiders.the_north_face_offline_store_spider import TheNorthFaceOfflineStoreSpider
-from spiders.xiaomi_offline_store_spider import XiaomiOfflineStoreSpider
-from spiders.salomon_offline_store_spider import SalomonOfflineStoreSpider
-from spiders.prada_offline_store_spider import PradaOfflineStoreSpider
-from spiders.polo_ralph_lauren_offline_store_spider import (
-    PoloRalphLaurenOfflineStoreSpider,
-)
-from spiders.toryburch_offline_store_spider import ToryBurchOfflineStoreSpider
+from typing import Dict, List, Tuple, Type
+
 from spiders.store_schema import STORE_CSV_HEADER, StoreItem
+from spiders.store_spider_base import BaseStoreSpider
 
 BASE_DIR = Path(__file__).resolve().parent
 BRAND_LIST_PATH = BASE_DIR / "各品牌网站"
 OUTPUT_DIR = BASE_DIR / "各品牌爬虫数据"
+# 默认逐个品牌串行抓取：并非所有爬虫都确认过线程安全（模块级共享状态等），
+# 确认可并发时用 --workers 开启按品牌并发
+MAX_WORKERS = 1
 
-# 品牌英文名 -> 爬虫类
+# 品牌英文名 -> "模块:爬虫类"，按需导入，只跑部分品牌时不加载其余爬虫
 BRAND_SPIDERS = {
-    "DJI": DJIOfflineStoreSpider,
-    "Insta360": Insta360OfflineStoreSpider,
-    "Apple": AppleOfflineStoreSpider,
-    "Huawei": HuaweiOfflineStoreSpider,
-    "Arc'teryx": ArcteryxOfflineStoreSpider,
-    "Coach": CoachOfflineStoreSpider,
-    "Hermès": HermesOfflineStoreSpider,
-    "Samsung": SamsungOfflineStoreSpider,
-    "OPPO": OppoOfflineStoreSpider,
-    "Popmart": PopmartOfflineStoreSpider,
-    "Honor": HonorOfflineStoreSpider,
-    "On": OnOfflineStoreSpider,
-    "Salomon": SalomonOfflineStoreSpider,
-    "Xiaomi": XiaomiOfflineStoreSpider,
-    "NIO": NioOfflineStoreSpider,
-    "The North Face": TheNorthFaceOfflineStoreSpider,
-    "Prada": PradaOfflineStoreSpider,
-    "Polo Ralph Lauren": PoloRalphLaurenOfflineStoreSpider,
-    "Tory Burch": ToryBurchOfflineStoreSpider,
+    "DJI": "spiders.dji_offline_store_spider:DJIOfflineStoreSpider",
+    "Insta360": "spiders.insta360_offline_store_spider:Insta360OfflineStoreSpider",
+    "Apple": "spiders.apple_offline_store_spider:AppleOfflineStoreSpider",
+    "Huawei": "spiders.huawei_offline_store_spider:HuaweiOfflineStoreSpider",
+    "Arc'teryx": "spiders.arcteryx_offline_store_spider:ArcteryxOfflineStoreSpider",
+    "Coach": "spiders.coach_offline_store_spider:CoachOfflineStoreSpider",
+    "Hermès": "spiders.hermes_offline_store_spider:HermesOfflineStoreSpider",
+    "Samsung": "spiders.samsung_offline_store_spider:SamsungOfflineStoreSpider",
+    "OPPO": "spiders.oppo_offline_store_spider:OppoOfflineStoreSpider",
+    "Popmart": "spiders.popmart_offline_store_spider:PopmartOfflineStoreSpider",
+    "Honor": "spiders.honor_offline_store_spider:HonorOfflineStoreSpider",
+    "On": "spiders.on_offline_store_spider:OnOfflineStoreSpider",
+    "Salomon": "spiders.salomon_offline_store_spider:SalomonOfflineStoreSpider",
+    "Xiaomi": "spiders.xiaomi_offline_store_spider:XiaomiOfflineStoreSpider",
+    "NIO": "spiders.nio_offline_store_spider:NioOfflineStoreSpider",
+    "The North Face": "spiders.the_north_face_offline_store_spider:TheNorthFaceOfflineStoreSpider",
+    "Prada": "spiders.prada_offline_store_spider:PradaOfflineStoreSpider",
+    "Polo Ralph Lauren": "spiders.polo_ralph_lauren_offline_store_spider:PoloRalphLaurenOfflineStoreSpider",
+    "Tory Burch": "spiders.toryburch_offline_store_spider:ToryBurchOfflineStoreSpider",
 }
 
 
+def get_spider(brand_en: str) -> Type[BaseStoreSpider]:
+    module_name, class_name = BRAND_SPIDERS[brand_en].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
 def load_brand_rows(path: Path) -> List[Tuple[str, str]]:
     """从《各品牌网站》文件读取品牌英文名和入口链接。"""
     rows: List[Tuple[str, str]] = []
@@ -76,48 +66,73 @@ def load_brand_rows(path: Path) -> List[Tuple[str, str]]:
     return rows
 
 
-def save_merged(items: List[StoreItem], path: Path) -> None:
-    with open(path, "w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=STORE_CSV_HEADER)
-        writer.writeheader()
-        for item in items:
-            writer.writerow(item.to_row())
+def run_spider(brand_en: str) -> Tuple[List[StoreItem], str]:
+    """抓取单个品牌并写出品牌 CSV，返回 (门店列表, 失败原因)。"""
+    try:
+        spider = get_spider(brand_en)()
+        items = spider.fetch_items()
+        out_path = OUTPUT_DIR / f"{brand_en}_offline_stores.csv"
+        spider.save_to_csv(items, str(out_path), validate_province=False)
+    except ImportError as exc:
+        return [], f"爬虫加载失败: {exc}"
+    except Exception as exc:  # pragma: no cover - 运行期异常记录
+        return [], f"抓取失败: {exc}"
+    return items, ""
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="批量运行各品牌门店爬虫")
+    parser.add_argument(
+        "--brands",
+        default="",
+        help="只运行指定品牌（英文名，逗号分隔），合并结果写入 selected_brands_offline_stores.csv",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"同时运行的爬虫数（默认 {MAX_WORKERS}，即串行；仅在确认所选爬虫线程安全时调大）",
+    )
+    args = parser.parse_args()
+
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     brand_rows = load_brand_rows(BRAND_LIST_PATH)
+    selected = {b.strip() for b in args.brands.split(",") if b.strip()}
+    if selected:
+        brand_rows = [(b, link) for b, link in brand_rows if b in selected]
 
-    merged: List[StoreItem] = []
     success: Dict[str, int] = {}
     failed: Dict[str, str] = {}
 
+    todo = list(dict.fromkeys(b for b, _link in brand_rows if b in BRAND_SPIDERS))
     for brand_en, _link in brand_rows:
-        spider_cls = BRAND_SPIDERS.get(brand_en)
-        if not spider_cls:
+        if brand_en not in BRAND_SPIDERS:
             failed[brand_en] = "未实现爬虫"
-            continue
-
-        spider = spider_cls()
-        try:
-            items = spider.fetch_items()
-            merged.extend(items)
-            out_path = OUTPUT_DIR / f"{brand_en}_offline_stores.csv"
-            spider.save_to_csv(items, str(out_path), validate_province=False)
-            success[brand_en] = len(items)
-        except Exception as exc:  # pragma: no cover - 运行期异常记录
-            failed[brand_en] = f"抓取失败: {exc}"
 
-    # 合并导出
-    merged_path = OUTPUT_DIR / "all_brands_offline_stores.csv"
-    save_merged(merged, merged_path)
+    # 合并导出：executor.map 按品牌清单顺序产出，每个品牌完成即写入，不在内存中累积
+    # 只跑部分品牌时另存，避免覆盖全量合并文件
+    merged_name = "selected_brands_offline_stores.csv" if selected else "all_brands_offline_stores.csv"
+    merged_path = OUTPUT_DIR / merged_name
+    merged_count = 0
+    with open(merged_path, "w", newline="", encoding="utf-8-sig") as f, ThreadPoolExecutor(
+        max_workers=max(1, min(args.workers, len(todo)))
+    ) as executor:
+        writer = csv.DictWriter(f, fieldnames=STORE_CSV_HEADER)
+        writer.writeheader()
+        for brand_en, (items, error) in zip(todo, executor.map(run_spider, todo)):
+            if error:
+                failed[brand_en] = error
+                continue
+            writer.writerows(item.to_row() for item in items)
+            success[brand_en] = len(items)
+            merged_count += len(items)
 
     print("\n=== 抓取完成 ===")
     for b, cnt in success.items():
         print(f"[成功] {b}: {cnt} 条")
     for b, reason in failed.items():
         print(f"[失败] {b}: {reason}")
-    print(f"合并输出: {merged_path} ({len(merged)} 条)")
+    print(f"合并输出: {merged_path} ({merged_count} 条)")
 
 
 if __name__ == "__main__":
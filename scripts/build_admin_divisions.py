@@ -107,220 +107,291 @@ TIER_4 = {
 }
 
 
+# 城市简称 -> 等级；倒序合并，若同一城市出现在多个等级中以较高等级为准
+TIER_MAP = {
+    city: tier
+    for tier, cities in (
+        ("四线", TIER_4),
+        ("三线", TIER_3),
+        ("二线", TIER_2),
+        ("新一线", NEW_TIER_1),
+        ("一线", TIER_1),
+    )
+    for city in cities
+}
+
+
 def get_city_tier(short_name: str) -> str:
     """根据城市简称获取城市等级"""
-    if short_name in TIER_1:
-        return "一线"
-    elif short_name in NEW_TIER_1:
-        return "新一线"
-    elif short_name in TIER_2:
-        return "二线"
-    elif short_name in TIER_3:
-        return "三线"
-    elif short_name in TIER_4:
-        return "四线"
-    else:
-        return "五线"
+    return TIER_MAP.get(short_name, "五线")
 
 
 # ============================================================================
 # 城市群数据
 # ============================================================================
 
-CITY_CLUSTERS = {
+# (城市群, 城市简称...) 分组，城市群名称只写一次；展开为 CITY_CLUSTERS 供按城市查找
+CITY_CLUSTER_GROUPS = [
     # 长三角城市群
-    "上海": "长三角城市群", "南京": "长三角城市群", "杭州": "长三角城市群",
-    "苏州": "长三角城市群", "无锡": "长三角城市群", "宁波": "长三角城市群",
-    "常州": "长三角城市群", "南通": "长三角城市群", "嘉兴": "长三角城市群",
-    "湖州": "长三角城市群", "绍兴": "长三角城市群", "金华": "长三角城市群",
-    "舟山": "长三角城市群", "台州": "长三角城市群", "扬州": "长三角城市群",
-    "镇江": "长三角城市群", "泰州": "长三角城市群", "盐城": "长三角城市群",
-    "淮安": "长三角城市群", "连云港": "长三角城市群", "徐州": "长三角城市群",
-    "宿迁": "长三角城市群", "芜湖": "长三角城市群", "马鞍山": "长三角城市群",
-    "铜陵": "长三角城市群", "安庆": "长三角城市群", "池州": "长三角城市群",
-    "宣城": "长三角城市群", "合肥": "长三角城市群", "滁州": "长三角城市群",
-    "蚌埠": "长三角城市群", "阜阳": "长三角城市群", "宿州": "长三角城市群",
-    "六安": "长三角城市群", "亳州": "长三角城市群", "淮南": "长三角城市群",
-    "淮北": "长三角城市群", "黄山": "长三角城市群",  # 安徽全境纳入长三角
-    "温州": "长三角城市群", "丽水": "长三角城市群", "衢州": "长三角城市群",  # 浙江全境
+    ("长三角城市群", (
+        "上海", "南京", "杭州",
+        "苏州", "无锡", "宁波",
+        "常州", "南通", "嘉兴",
+        "湖州", "绍兴", "金华",
+        "舟山", "台州", "扬州",
+        "镇江", "泰州", "盐城",
+        "淮安", "连云港", "徐州",
+        "宿迁", "芜湖", "马鞍山",
+        "铜陵", "安庆", "池州",
+        "宣城", "合肥", "滁州",
+        "蚌埠", "阜阳", "宿州",
+        "六安", "亳州", "淮南",
+        "淮北", "黄山",  # 安徽全境纳入长三角
+        "温州", "丽水", "衢州",  # 浙江全境
+    )),
 
     # 粤港澳大湾区
-    "广州": "粤港澳大湾区", "深圳": "粤港澳大湾区", "珠海": "粤港澳大湾区",
-    "佛山": "粤港澳大湾区", "东莞": "粤港澳大湾区", "中山": "粤港澳大湾区",
-    "惠州": "粤港澳大湾区", "江门": "粤港澳大湾区", "肇庆": "粤港澳大湾区",
-    "汕头": "粤闽浙沿海城市群", "潮州": "粤闽浙沿海城市群", "揭阳": "粤闽浙沿海城市群",
-    "汕尾": "粤闽浙沿海城市群", "梅州": "粤闽浙沿海城市群",  # 粤东
-    "清远": "珠江-西江经济带", "韶关": "珠江-西江经济带", "河源": "珠江-西江经济带",  # 粤北
+    ("粤港澳大湾区", (
+        "广州", "深圳", "珠海",
+        "佛山", "东莞", "中山",
+        "惠州", "江门", "肇庆",
+    )),
+    ("粤闽浙沿海城市群", (
+        "汕头", "潮州", "揭阳",
+        "汕尾", "梅州",  # 粤东
+    )),
+    ("珠江-西江经济带", (
+        "清远", "韶关", "河源",  # 粤北
+    )),
 
     # 京津冀城市群
-    "北京": "京津冀城市群", "天津": "京津冀城市群", "石家庄": "京津冀城市群",
-    "保定": "京津冀城市群", "廊坊": "京津冀城市群", "唐山": "京津冀城市群",
-    "秦皇岛": "京津冀城市群", "张家口": "京津冀城市群", "承德": "京津冀城市群",
-    "沧州": "京津冀城市群", "衡水": "京津冀城市群", "邢台": "京津冀城市群",
-    "邯郸": "京津冀城市群",
+    ("京津冀城市群", (
+        "北京", "天津", "石家庄",
+        "保定", "廊坊", "唐山",
+        "秦皇岛", "张家口", "承德",
+        "沧州", "衡水", "邢台",
+        "邯郸",
+    )),
 
     # 成渝城市群
-    "成都": "成渝城市群", "重庆": "成渝城市群", "绵阳": "成渝城市群",
-    "德阳": "成渝城市群", "乐山": "成渝城市群", "眉山": "成渝城市群",
-    "资阳": "成渝城市群", "内江": "成渝城市群", "自贡": "成渝城市群",
-    "泸州": "成渝城市群", "宜宾": "成渝城市群", "南充": "成渝城市群",
-    "遂宁": "成渝城市群", "达州": "成渝城市群", "广安": "成渝城市群",
-    "广元": "成渝城市群", "巴中": "成渝城市群", "雅安": "成渝城市群",
-    "攀枝花": "成渝城市群", "凉山彝族": "成渝城市群",  # 四川全境
-    "甘孜藏族": "成渝城市群", "阿坝藏族羌族": "成渝城市群",
+    ("成渝城市群", (
+        "成都", "重庆", "绵阳",
+        "德阳", "乐山", "眉山",
+        "资阳", "内江", "自贡",
+        "泸州", "宜宾", "南充",
+        "遂宁", "达州", "广安",
+        "广元", "巴中", "雅安",
+        "攀枝花", "凉山彝族",  # 四川全境
+        "甘孜藏族", "阿坝藏族羌族",
+    )),
 
     # 长江中游城市群
-    "武汉": "长江中游城市群", "长沙": "长江中游城市群", "南昌": "长江中游城市群",
-    "黄石": "长江中游城市群", "鄂州": "长江中游城市群", "黄冈": "长江中游城市群",
-    "孝感": "长江中游城市群", "咸宁": "长江中游城市群", "仙桃": "长江中游城市群",
-    "潜江": "长江中游城市群", "天门": "长江中游城市群", "株洲": "长江中游城市群",
-    "湘潭": "长江中游城市群", "岳阳": "长江中游城市群", "益阳": "长江中游城市群",
-    "常德": "长江中游城市群", "衡阳": "长江中游城市群", "娄底": "长江中游城市群",
-    "九江": "长江中游城市群", "景德镇": "长江中游城市群", "萍乡": "长江中游城市群",
-    "新余": "长江中游城市群", "鹰潭": "长江中游城市群", "抚州": "长江中游城市群",
-    "宜春": "长江中游城市群", "上饶": "长江中游城市群", "吉安": "长江中游城市群",
-    # 湖北全境
-    "宜昌": "长江中游城市群", "襄阳": "长江中游城市群", "荆州": "长江中游城市群",
-    "荆门": "长江中游城市群", "十堰": "长江中游城市群", "随州": "长江中游城市群",
-    "恩施土家族苗族": "长江中游城市群", "神农架": "长江中游城市群",
-    # 湖南全境
-    "郴州": "长江中游城市群", "永州": "长江中游城市群", "怀化": "长江中游城市群",
-    "邵阳": "长江中游城市群", "张家界": "长江中游城市群", "湘西土家族苗族": "长江中游城市群",
+    ("长江中游城市群", (
+        "武汉", "长沙", "南昌",
+        "黄石", "鄂州", "黄冈",
+        "孝感", "咸宁", "仙桃",
+        "潜江", "天门", "株洲",
+        "湘潭", "岳阳", "益阳",
+        "常德", "衡阳", "娄底",
+        "九江", "景德镇", "萍乡",
+        "新余", "鹰潭", "抚州",
+        "宜春", "上饶", "吉安",
+        # 湖北全境
+        "宜昌", "襄阳", "荆州",
+        "荆门", "十堰", "随州",
+        "恩施土家族苗族", "神农架",
+        # 湖南全境
+        "郴州", "永州", "怀化",
+        "邵阳", "张家界", "湘西土家族苗族",
+    )),
 
     # 山东半岛城市群
-    "济南": "山东半岛城市群", "青岛": "山东半岛城市群", "烟台": "山东半岛城市群",
-    "威海": "山东半岛城市群", "潍坊": "山东半岛城市群", "淄博": "山东半岛城市群",
-    "东营": "山东半岛城市群", "日照": "山东半岛城市群", "临沂": "山东半岛城市群",
-    "枣庄": "山东半岛城市群", "济宁": "山东半岛城市群", "泰安": "山东半岛城市群",
-    "莱芜": "山东半岛城市群", "德州": "山东半岛城市群", "聊城": "山东半岛城市群",
-    "滨州": "山东半岛城市群", "菏泽": "山东半岛城市群",
+    ("山东半岛城市群", (
+        "济南", "青岛", "烟台",
+        "威海", "潍坊", "淄博",
+        "东营", "日照", "临沂",
+        "枣庄", "济宁", "泰安",
+        "莱芜", "德州", "聊城",
+        "滨州", "菏泽",
+    )),
 
     # 中原城市群
-    "郑州": "中原城市群", "洛阳": "中原城市群", "开封": "中原城市群",
-    "新乡": "中原城市群", "焦作": "中原城市群", "许昌": "中原城市群",
-    "平顶山": "中原城市群", "漯河": "中原城市群", "济源": "中原城市群",
-    "安阳": "中原城市群", "鹤壁": "中原城市群", "濮阳": "中原城市群",
-    "商丘": "中原城市群", "周口": "中原城市群", "信阳": "中原城市群",
-    "南阳": "中原城市群", "驻马店": "中原城市群", "三门峡": "中原城市群",
+    ("中原城市群", (
+        "郑州", "洛阳", "开封",
+        "新乡", "焦作", "许昌",
+        "平顶山", "漯河", "济源",
+        "安阳", "鹤壁", "濮阳",
+        "商丘", "周口", "信阳",
+        "南阳", "驻马店", "三门峡",
+    )),
 
     # 海峡西岸城市群 (福建全境 + 赣东)
-    "福州": "海峡西岸城市群", "厦门": "海峡西岸城市群", "泉州": "海峡西岸城市群",
-    "漳州": "海峡西岸城市群", "莆田": "海峡西岸城市群", "宁德": "海峡西岸城市群",
-    "龙岩": "海峡西岸城市群", "三明": "海峡西岸城市群", "南平": "海峡西岸城市群",
-    "赣州": "海峡西岸城市群",  # 赣南纳入海西
+    ("海峡西岸城市群", (
+        "福州", "厦门", "泉州",
+        "漳州", "莆田", "宁德",
+        "龙岩", "三明", "南平",
+        "赣州",  # 赣南纳入海西
+    )),
 
     # 海南自贸港
-    "海口": "海南自贸港", "三亚": "海南自贸港", "儋州": "海南自贸港",
-    "五指山": "海南自贸港", "文昌": "海南自贸港", "琼海": "海南自贸港",
-    "万宁": "海南自贸港", "东方": "海南自贸港", "定安县": "海南自贸港",
-    "屯昌县": "海南自贸港", "澄迈县": "海南自贸港", "临高县": "海南自贸港",
-    "白沙黎族": "海南自贸港", "昌江黎族": "海南自贸港", "乐东黎族": "海南自贸港",
-    "陵水黎族": "海南自贸港", "保亭黎族苗族": "海南自贸港", "琼中黎族苗族": "海南自贸港",
+    ("海南自贸港", (
+        "海口", "三亚", "儋州",
+        "五指山", "文昌", "琼海",
+        "万宁", "东方", "定安县",
+        "屯昌县", "澄迈县", "临高县",
+        "白沙黎族", "昌江黎族", "乐东黎族",
+        "陵水黎族", "保亭黎族苗族", "琼中黎族苗族",
+    )),
 
     # 辽中南城市群
-    "沈阳": "辽中南城市群", "大连": "辽中南城市群", "鞍山": "辽中南城市群",
-    "抚顺": "辽中南城市群", "本溪": "辽中南城市群", "丹东": "辽中南城市群",
-    "锦州": "辽中南城市群", "营口": "辽中南城市群", "辽阳": "辽中南城市群",
-    "盘锦": "辽中南城市群", "铁岭": "辽中南城市群", "朝阳": "辽中南城市群",
-    "葫芦岛": "辽中南城市群", "阜新": "辽中南城市群",  # 辽宁全境
+    ("辽中南城市群", (
+        "沈阳", "大连", "鞍山",
+        "抚顺", "本溪", "丹东",
+        "锦州", "营口", "辽阳",
+        "盘锦", "铁岭", "朝阳",
+        "葫芦岛", "阜新",  # 辽宁全境
+    )),
 
     # 哈长城市群
-    "哈尔滨": "哈长城市群", "长春": "哈长城市群", "吉林": "哈长城市群",
-    "大庆": "哈长城市群", "齐齐哈尔": "哈长城市群", "绥化": "哈长城市群",
-    "松原": "哈长城市群", "四平": "哈长城市群", "辽源": "哈长城市群",
-    "延边朝鲜族": "哈长城市群", "通化": "哈长城市群", "白山": "哈长城市群",
-    "白城": "哈长城市群",  # 吉林全境
-    "牡丹江": "哈长城市群", "佳木斯": "哈长城市群", "鸡西": "哈长城市群",
-    "双鸭山": "哈长城市群", "伊春": "哈长城市群", "七台河": "哈长城市群",
-    "鹤岗": "哈长城市群", "黑河": "哈长城市群", "大兴安岭": "哈长城市群",  # 黑龙江全境
+    ("哈长城市群", (
+        "哈尔滨", "长春", "吉林",
+        "大庆", "齐齐哈尔", "绥化",
+        "松原", "四平", "辽源",
+        "延边朝鲜族", "通化", "白山",
+        "白城",  # 吉林全境
+        "牡丹江", "佳木斯", "鸡西",
+        "双鸭山", "伊春", "七台河",
+        "鹤岗", "黑河", "大兴安岭",  # 黑龙江全境
+    )),
 
     # 关中平原城市群
-    "西安": "关中平原城市群", "咸阳": "关中平原城市群", "宝鸡": "关中平原城市群",
-    "渭南": "关中平原城市群", "铜川": "关中平原城市群", "商洛": "关中平原城市群",
-    "运城": "关中平原城市群", "临汾": "关中平原城市群", "天水": "关中平原城市群",
-    "平凉": "关中平原城市群", "庆阳": "关中平原城市群",
-    "延安": "关中平原城市群", "榆林": "关中平原城市群", "汉中": "关中平原城市群",
-    "安康": "关中平原城市群",  # 陕西全境
+    ("关中平原城市群", (
+        "西安", "咸阳", "宝鸡",
+        "渭南", "铜川", "商洛",
+        "运城", "临汾",
+        "延安", "汉中",
+        "安康",  # 陕西全境（榆林归呼包鄂榆，天水/平凉/庆阳归兰西）
+    )),
 
     # 太原都市圈 / 山西中部城市群
-    "太原": "山西中部城市群", "晋中": "山西中部城市群", "忻州": "山西中部城市群",
-    "吕梁": "山西中部城市群", "阳泉": "山西中部城市群",
-    "长治": "山西中部城市群", "晋城": "山西中部城市群",  # 山西中南部
-    "大同": "山西中部城市群", "朔州": "山西中部城市群",  # 山西北部
+    ("山西中部城市群", (
+        "太原", "晋中", "忻州",
+        "吕梁", "阳泉",
+        "长治", "晋城",  # 山西中南部
+        "大同", "朔州",  # 山西北部
+    )),
 
     # 北部湾城市群
-    "南宁": "北部湾城市群", "北海": "北部湾城市群", "钦州": "北部湾城市群",
-    "防城港": "北部湾城市群", "玉林": "北部湾城市群", "崇左": "北部湾城市群",
-    "湛江": "北部湾城市群", "茂名": "北部湾城市群", "阳江": "北部湾城市群",
-    "柳州": "北部湾城市群", "桂林": "北部湾城市群", "贵港": "北部湾城市群",
-    "百色": "北部湾城市群", "河池": "北部湾城市群", "来宾": "北部湾城市群",
-    "贺州": "北部湾城市群", "梧州": "北部湾城市群",  # 广西全境
+    ("北部湾城市群", (
+        "南宁", "北海", "钦州",
+        "防城港", "玉林", "崇左",
+        "湛江", "茂名", "阳江",
+        "柳州", "桂林", "贵港",
+        "百色", "河池", "来宾",
+        "贺州", "梧州",  # 广西全境
+    )),
 
     # 黔中城市群
-    "贵阳": "黔中城市群", "遵义": "黔中城市群", "安顺": "黔中城市群",
-    "毕节": "黔中城市群", "六盘水": "黔中城市群",
+    ("黔中城市群", (
+        "贵阳", "遵义", "安顺",
+        "毕节", "六盘水",
+    )),
 
     # 滇中城市群
-    "昆明": "滇中城市群", "曲靖": "滇中城市群", "玉溪": "滇中城市群",
-    "楚雄": "滇中城市群", "红河": "滇中城市群",
+    ("滇中城市群", (
+        "昆明", "曲靖", "玉溪",
+        "楚雄", "红河",
+    )),
 
     # 呼包鄂榆城市群
-    "呼和浩特": "呼包鄂榆城市群", "包头": "呼包鄂榆城市群", "鄂尔多斯": "呼包鄂榆城市群",
-    "榆林": "呼包鄂榆城市群",
-    "赤峰": "呼包鄂榆城市群", "通辽": "呼包鄂榆城市群",
-    "呼伦贝尔": "呼包鄂榆城市群", "巴彦淖尔": "呼包鄂榆城市群",
-    "乌兰察布": "呼包鄂榆城市群", "锡林郭勒": "呼包鄂榆城市群",
-    "兴安": "呼包鄂榆城市群", "阿拉善": "呼包鄂榆城市群", "乌海": "呼包鄂榆城市群",  # 内蒙古全境
+    ("呼包鄂榆城市群", (
+        "呼和浩特", "包头", "鄂尔多斯",
+        "榆林",
+        "赤峰", "通辽",
+        "呼伦贝尔", "巴彦淖尔",
+        "乌兰察布", "锡林郭勒",
+        "兴安", "阿拉善", "乌海",  # 内蒙古全境
+    )),
 
     # 兰西城市群
-    "兰州": "兰西城市群", "西宁": "兰西城市群", "白银": "兰西城市群",
-    "定西": "兰西城市群", "临夏回族": "兰西城市群", "海东": "兰西城市群",
-    "天水": "兰西城市群", "平凉": "兰西城市群", "庆阳": "兰西城市群",
-    "武威": "兰西城市群", "张掖": "兰西城市群", "酒泉": "兰西城市群",
-    "嘉峪关": "兰西城市群", "金昌": "兰西城市群", "陇南": "兰西城市群",
-    "甘南藏族": "兰西城市群",  # 甘肃全境
-    "海西蒙古族藏族": "兰西城市群", "海南藏族": "兰西城市群",
-    "海北藏族": "兰西城市群", "黄南藏族": "兰西城市群",
-    "玉树藏族": "兰西城市群", "果洛藏族": "兰西城市群",  # 青海全境
+    ("兰西城市群", (
+        "兰州", "西宁", "白银",
+        "定西", "临夏回族", "海东",
+        "天水", "平凉", "庆阳",
+        "武威", "张掖", "酒泉",
+        "嘉峪关", "金昌", "陇南",
+        "甘南藏族",  # 甘肃全境
+        "海西蒙古族藏族", "海南藏族",
+        "海北藏族", "黄南藏族",
+        "玉树藏族", "果洛藏族",  # 青海全境
+    )),
 
     # 宁夏沿黄城市群
-    "银川": "宁夏沿黄城市群", "石嘴山": "宁夏沿黄城市群", "吴忠": "宁夏沿黄城市群",
-    "中卫": "宁夏沿黄城市群", "固原": "宁夏沿黄城市群",  # 宁夏全境
+    ("宁夏沿黄城市群", (
+        "银川", "石嘴山", "吴忠",
+        "中卫", "固原",  # 宁夏全境
+    )),
 
     # 天山北坡城市群 / 新疆城市群
-    "乌鲁木齐": "天山北坡城市群", "昌吉回族": "天山北坡城市群", "石河子": "天山北坡城市群",
-    "克拉玛依": "天山北坡城市群", "伊犁哈萨克": "天山北坡城市群",
-    "阿克苏": "天山北坡城市群", "喀什": "天山北坡城市群", "和田": "天山北坡城市群",
-    "巴音郭楞蒙古": "天山北坡城市群", "塔城": "天山北坡城市群", "阿勒泰": "天山北坡城市群",
-    "博尔塔拉蒙古": "天山北坡城市群", "吐鲁番": "天山北坡城市群", "哈密": "天山北坡城市群",
-    "克孜勒苏柯尔克孜": "天山北坡城市群",  # 新疆全境
-    "北屯": "天山北坡城市群", "阿拉尔": "天山北坡城市群", "图木舒克": "天山北坡城市群",
-    "五家渠": "天山北坡城市群", "铁门关": "天山北坡城市群", "双河": "天山北坡城市群",
-    "可克达拉": "天山北坡城市群", "昆玉": "天山北坡城市群", "胡杨河": "天山北坡城市群",
-    "新星": "天山北坡城市群", "白杨": "天山北坡城市群",  # 新疆兵团
+    ("天山北坡城市群", (
+        "乌鲁木齐", "昌吉回族", "石河子",
+        "克拉玛依", "伊犁哈萨克",
+        "阿克苏", "喀什", "和田",
+        "巴音郭楞蒙古", "塔城", "阿勒泰",
+        "博尔塔拉蒙古", "吐鲁番", "哈密",
+        "克孜勒苏柯尔克孜",  # 新疆全境
+        "北屯", "阿拉尔", "图木舒克",
+        "五家渠", "铁门关", "双河",
+        "可克达拉", "昆玉", "胡杨河",
+        "新星", "白杨",  # 新疆兵团
+    )),
 
     # 滇中城市群扩展
-    "红河哈尼族彝族": "滇中城市群", "楚雄彝族": "滇中城市群",
-    "文山壮族苗族": "滇中城市群", "大理白族": "滇中城市群",
-    "西双版纳傣族": "滇中城市群", "德宏傣族景颇族": "滇中城市群",
-    "怒江傈僳族": "滇中城市群", "迪庆藏族": "滇中城市群",
-    "普洱": "滇中城市群", "临沧": "滇中城市群", "保山": "滇中城市群",
-    "昭通": "滇中城市群", "丽江": "滇中城市群",  # 云南全境
+    ("滇中城市群", (
+        "红河哈尼族彝族", "楚雄彝族",
+        "文山壮族苗族", "大理白族",
+        "西双版纳傣族", "德宏傣族景颇族",
+        "怒江傈僳族", "迪庆藏族",
+        "普洱", "临沧", "保山",
+        "昭通", "丽江",  # 云南全境
+    )),
 
     # 黔中城市群扩展
-    "黔南布依族苗族": "黔中城市群", "黔东南苗族侗族": "黔中城市群",
-    "黔西南布依族苗族": "黔中城市群", "铜仁": "黔中城市群",  # 贵州全境
+    ("黔中城市群", (
+        "黔南布依族苗族", "黔东南苗族侗族",
+        "黔西南布依族苗族", "铜仁",  # 贵州全境
+    )),
 
     # 西藏城市群
-    "拉萨": "西藏城市群", "日喀则": "西藏城市群", "昌都": "西藏城市群",
-    "林芝": "西藏城市群", "山南": "西藏城市群", "那曲": "西藏城市群", "阿里": "西藏城市群",
+    ("西藏城市群", (
+        "拉萨", "日喀则", "昌都",
+        "林芝", "山南", "那曲", "阿里",
+    )),
 
     # 云浮纳入珠三角
-    "云浮": "粤港澳大湾区",
+    ("粤港澳大湾区", (
+        "云浮",
+    )),
 
     # 重庆郊县
-    "重庆郊县": "成渝城市群",
-}
+    ("成渝城市群", (
+        "重庆郊县",
+    )),
+]
+
+
+def _build_city_clusters(groups) -> dict:
+    """展开城市群分组为 城市 -> 城市群；同一城市重复出现时报错，避免被后面的分组静默覆盖"""
+    clusters: dict = {}
+    for cluster, cities in groups:
+        for city in cities:
+            if city in clusters:
+                raise ValueError(f"城市 {city} 同时出现在 {clusters[city]} 与 {cluster}")
+            clusters[city] = cluster
+    return clusters
+
+
+CITY_CLUSTERS = _build_city_clusters(CITY_CLUSTER_GROUPS)
 
 # ============================================================================
 # 直辖市和副省级城市
@@ -773,69 +844,35 @@ CITY_DATA = {
     "甘孜藏族": {"gdp": 502.00, "population": 110, "income_per_capita": 26800},
     "阿坝藏族羌族": {"gdp": 502.00, "population": 83, "income_per_capita": 28500},
 
-    # 云南自治州
-    "红河哈尼族彝族": {"gdp": 2956.00, "population": 450, "income_per_capita": 28500},
-    "楚雄彝族": {"gdp": 1702.00, "population": 242, "income_per_capita": 35200},
-    "文山壮族苗族": {"gdp": 1456.00, "population": 362, "income_per_capita": 26800},
-    "大理白族": {"gdp": 1702.00, "population": 333, "income_per_capita": 32200},
-    "西双版纳傣族": {"gdp": 802.00, "population": 133, "income_per_capita": 28500},
-    "德宏傣族景颇族": {"gdp": 602.00, "population": 132, "income_per_capita": 26800},
-    "怒江傈僳族": {"gdp": 252.00, "population": 55, "income_per_capita": 22800},
-    "迪庆藏族": {"gdp": 302.00, "population": 39, "income_per_capita": 28500},
-
-    # 贵州自治州
-    "黔南布依族苗族": {"gdp": 1756.00, "population": 330, "income_per_capita": 28500},
-    "黔东南苗族侗族": {"gdp": 1356.00, "population": 375, "income_per_capita": 26800},
-    "黔西南布依族苗族": {"gdp": 1456.00, "population": 302, "income_per_capita": 26500},
-
     # 湖北自治州
     "恩施土家族苗族": {"gdp": 1302.00, "population": 329, "income_per_capita": 26800},
 
     # 湖南自治州
     "湘西土家族苗族": {"gdp": 902.00, "population": 248, "income_per_capita": 26800},
 
-    # 吉林自治州
-    "延边朝鲜族": {"gdp": 902.00, "population": 194, "income_per_capita": 32800},
-    "通化": {"gdp": 602.00, "population": 186, "income_per_capita": 28500},
-
-    # 内蒙古
-    "赤峰": {"gdp": 2102.00, "population": 403, "income_per_capita": 32200},
-    "呼伦贝尔": {"gdp": 1702.00, "population": 230, "income_per_capita": 35200},
-    "巴彦淖尔": {"gdp": 1102.00, "population": 153, "income_per_capita": 32800},
-    "乌兰察布": {"gdp": 1102.00, "population": 171, "income_per_capita": 28500},
-    "锡林郭勒": {"gdp": 1102.00, "population": 114, "income_per_capita": 42500},
-    "兴安": {"gdp": 602.00, "population": 141, "income_per_capita": 28500},
-    "阿拉善": {"gdp": 502.00, "population": 27, "income_per_capita": 52800},
-
-    # 黑龙江
-    "牡丹江": {"gdp": 1002.00, "population": 229, "income_per_capita": 32200},
-    "黑河": {"gdp": 602.00, "population": 127, "income_per_capita": 26800},
-    "伊春": {"gdp": 402.00, "population": 83, "income_per_capita": 28500},
-    "七台河": {"gdp": 302.00, "population": 66, "income_per_capita": 28500},
-    "鸡西": {"gdp": 602.00, "population": 150, "income_per_capita": 28500},
-    "鹤岗": {"gdp": 402.00, "population": 89, "income_per_capita": 26800},
-    "双鸭山": {"gdp": 602.00, "population": 130, "income_per_capita": 28500},
-    "大兴安岭": {"gdp": 202.00, "population": 33, "income_per_capita": 32800},
-
-    # 辽宁
-    "阜新": {"gdp": 602.00, "population": 167, "income_per_capita": 28500},
-
     # 吉林
-    "白城": {"gdp": 702.00, "population": 159, "income_per_capita": 26800},
-    "白山": {"gdp": 602.00, "population": 93, "income_per_capita": 32200},
-
-    # 广西
-    "百色": {"gdp": 1602.00, "population": 347, "income_per_capita": 26800},
-    "河池": {"gdp": 1102.00, "population": 341, "income_per_capita": 22800},
-    "贺州": {"gdp": 902.00, "population": 195, "income_per_capita": 28500},
-    "来宾": {"gdp": 902.00, "population": 207, "income_per_capita": 26800},
-    "梧州": {"gdp": 1302.00, "population": 282, "income_per_capita": 32800},
-    "贵港": {"gdp": 1502.00, "population": 428, "income_per_capita": 28200},
+    "通化": {"gdp": 602.00, "population": 186, "income_per_capita": 28500},
 
     # 重庆郊县（特殊处理）
     "重庆郊县": {"gdp": 5000.00, "population": 800, "income_per_capita": 32200},
 }
 
+# 自治州全称 -> CITY_DATA 中的简称（clean_city_name 只去掉“自治州”，保留民族名）
+CITY_ALIASES = {
+    "红河哈尼族彝族": "红河",
+    "楚雄彝族": "楚雄",
+    "文山壮族苗族": "文山",
+    "大理白族": "大理",
+    "西双版纳傣族": "西双版纳",
+    "德宏傣族景颇族": "德宏",
+    "怒江傈僳族": "怒江",
+    "迪庆藏族": "迪庆",
+    "黔南布依族苗族": "黔南",
+    "黔东南苗族侗族": "黔东南",
+    "黔西南布依族苗族": "黔西南",
+    "延边朝鲜族": "延边",
+}
+
 
 # ============================================================================
 # 辅助函数
@@ -993,7 +1030,7 @@ def build_admin_divisions() -> None:
             is_subprovincial = short_city in SUBPROVINCIAL_CITIES
 
             # 城市经济数据
-            city_econ = CITY_DATA.get(short_city, {})
+            city_econ = CITY_DATA.get(CITY_ALIASES.get(short_city, short_city), {})
             gdp = city_econ.get("gdp", "")
             population = city_econ.get("population", "")
             income = city_econ.get("income_per_capita", "")
@@ -268,11 +268,13 @@ def parse_poi(raw: dict, brand: str, keyword: str, method: str, keywords: List[s
 
 
 def build_existing_index(df: pd.DataFrame) -> Dict[str, dict]:
-    idx: Dict[str, dict] = {}
-    for _, r in df.iterrows():
-        key = normalize_key(str(r.get("name") or ""), str(r.get("address") or ""))
-        idx[key] = r.to_dict()
-    return idx
+    if df.empty:
+        return {}
+    names = df["name"] if "name" in df.columns else [None] * len(df)
+    addrs = df["address"] if "address" in df.columns else [None] * len(df)
+    keys = [normalize_key(str(n or ""), str(a or "")) for n, a in zip(names, addrs)]
+    # 同 key 多行时保留最后一行，与逐行写入 dict 一致
+    return dict(zip(keys, df.to_dict("records")))
 
 
 def fuzzy_match(candidate: ParsedPoi, existing_df: pd.DataFrame) -> Tuple[str, Optional[str], Optional[str]]:
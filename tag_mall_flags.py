@@ -377,7 +377,18 @@ def next_mall_id(mall_df: pd.DataFrame) -> str:
 
 
 def normalize_city_col(series: pd.Series) -> pd.Series:
-    return series.fillna("").astype(str).apply(normalize_city)
+    # 城市取值重复度高：转为 category 后只对去重后的类别做标准化
+    return series.fillna("").astype(str).astype("category").map(normalize_city)
+
+
+def append_mall(
+    mall_df: pd.DataFrame, mall_city_norm: pd.Series, new_row: dict
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """追加一行商场，并同步扩展与 mall_df 按位置对齐的标准化城市列"""
+    mall_df = pd.concat([mall_df, pd.DataFrame([new_row])], ignore_index=True)
+    new_city = pd.Series([normalize_city(new_row["city"])], dtype=object)
+    mall_city_norm = pd.concat([mall_city_norm.astype(object), new_city], ignore_index=True)
+    return mall_df, mall_city_norm
 
 
 def save_unmatched(unmatched_items: List[UnmatchedItem]):
@@ -640,6 +651,9 @@ def tag_malls(apply: bool = False, use_llm: bool = True, interactive: bool = Fal
         mall_df["dji_opened"] = mall_df["mall_id"].astype(str).str.strip().isin(dji_malls)
         mall_df["insta_opened"] = mall_df["mall_id"].astype(str).str.strip().isin(insta_malls)
 
+    # 标准化城市列只算一次，新增商场时由 append_mall 同步扩展
+    mall_city_norm = normalize_city_col(mall_df["city"]).reset_index(drop=True)
+
     candidates = load_candidates()
     updated = 0
     created = 0
@@ -658,7 +672,7 @@ def tag_malls(apply: bool = False, use_llm: bool = True, interactive: bool = Fal
         flags_str = ",".join(cand.flags.keys())
         
         # 获取同城商场子集
-        subset = mall_df[normalize_city_col(mall_df["city"]) == city_norm].copy()
+        subset = mall_df[(mall_city_norm == city_norm).to_numpy()].copy()
         
         target_row = None
         poi = None
@@ -729,7 +743,7 @@ def tag_malls(apply: bool = False, use_llm: bool = True, interactive: bool = Fal
                             cand.city = poi["amap_city"]
                             city_norm = normalize_city(cand.city)
                             # 重新获取同城商场子集
-                            subset = mall_df[normalize_city_col(mall_df["city"]) == city_norm].copy()
+                            subset = mall_df[(mall_city_norm == city_norm).to_numpy()].copy()
                         elif choice == 0:
                             # 跳过
                             unmatched_items.append(UnmatchedItem(
@@ -790,7 +804,7 @@ def tag_malls(apply: bool = False, use_llm: bool = True, interactive: bool = Fal
                             "insta_opened": False,
                         }
                         new_row.update(cand.flags)
-                        mall_df = pd.concat([mall_df, pd.DataFrame([new_row])], ignore_index=True)
+                        mall_df, mall_city_norm = append_mall(mall_df, mall_city_norm, new_row)
                         created += 1
                         continue
                     elif interactive:
@@ -815,7 +829,7 @@ def tag_malls(apply: bool = False, use_llm: bool = True, interactive: bool = Fal
                                 "insta_opened": False,
                             }
                             new_row.update(cand.flags)
-                            mall_df = pd.concat([mall_df, pd.DataFrame([new_row])], ignore_index=True)
+                            mall_df, mall_city_norm = append_mall(mall_df, mall_city_norm, new_row)
                             created += 1
                             continue
                         else:
@@ -859,7 +873,7 @@ def tag_malls(apply: bool = False, use_llm: bool = True, interactive: bool = Fal
                             "insta_opened": False,
                         }
                         new_row.update(cand.flags)
-                        mall_df = pd.concat([mall_df, pd.DataFrame([new_row])], ignore_index=True)
+                        mall_df, mall_city_norm = append_mall(mall_df, mall_city_norm, new_row)
                         created += 1
                         continue
                     else:
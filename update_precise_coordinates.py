@@ -10,11 +10,16 @@ from typing import Optional
 import pandas as pd
 import requests
 
+from amap_utils import AMAP_QPS, STORE_SUFFIX_PATTERN, RateLimiter
+
 BASE_DIR = Path(__file__).resolve().parent
 CSV_FILE = BASE_DIR / "all_stores_final.csv"
 BACKUP_FILE = BASE_DIR / "all_stores_final.csv.backup"
 
 AMAP_TEXT_API = "https://restapi.amap.com/v3/place/text"
+# 本模块及导入其搜索函数的脚本（如 check_far_store_with_amap）共用的高德限流，
+# 多线程调用时总请求速率也不超过 AMAP_QPS
+RATE_LIMITER = RateLimiter(AMAP_QPS)
 
 
 def load_env_key() -> Optional[str]:
@@ -74,11 +79,12 @@ def search_store_by_name(store_name: str, city: str, brand: str) -> Optional[dic
         return None
     
     # 构造搜索关键词：优先使用"品牌 城市 门店名"，如果找不到再尝试"城市 门店名"
-    keywords_list = [
+    # 品牌为空等情况下变体会重复，按顺序去重避免重复请求
+    keywords_list = list(dict.fromkeys([
         f"{brand} {city} {store_name}".strip(),
         f"{city} {store_name}".strip(),
         store_name.strip(),
-    ]
+    ]))
     
     for keyword in keywords_list:
         params = {
@@ -92,6 +98,7 @@ def search_store_by_name(store_name: str, city: str, brand: str) -> Optional[dic
         }
         
         try:
+            RATE_LIMITER.acquire()
             resp = requests.get(AMAP_TEXT_API, params=params, timeout=15)
             resp.raise_for_status()
             data = resp.json()
@@ -106,6 +113,8 @@ def search_store_by_name(store_name: str, city: str, brand: str) -> Optional[dic
             # 尝试找到最匹配的POI
             best_match = None
             best_score = 0
+            # 去后缀的门店名与 POI 无关，循环外只算一次
+            bare_store_name = STORE_SUFFIX_PATTERN.sub("", store_name).strip()
             
             for poi in pois:
                 poi_name = poi.get("name", "")
@@ -116,7 +125,7 @@ def search_store_by_name(store_name: str, city: str, brand: str) -> Optional[dic
                 name_match = (
                     store_name in poi_name or 
                     poi_name in store_name or
-                    store_name.replace("授权体验店", "").replace("照材店", "").strip() in poi_name
+                    bare_store_name in poi_name
                 )
                 
                 # 检查是否包含品牌关键词
@@ -149,8 +158,7 @@ def search_store_by_name(store_name: str, city: str, brand: str) -> Optional[dic
                     "match_score": best_score,
                 }
             
-            # 如果第一个关键词没找到，尝试下一个
-            time.sleep(0.2)  # 避免请求过快
+            # 如果第一个关键词没找到，尝试下一个（请求间隔由 RATE_LIMITER 控制）
             
         except Exception as e:
             print(f"[错误] 搜索 '{keyword}' 时出错: {e}")
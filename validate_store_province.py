@@ -6,21 +6,41 @@
 
 from __future__ import annotations
 
+import atexit
 import os
+import re
+import shutil
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import pandas as pd
-import requests
+
+from amap_utils import (
+    AMAP_QPS,
+    STORE_SUFFIX_PATTERN,
+    RateLimiter,
+    cache_entry,
+    create_session,
+    load_json_cache,
+    save_json_cache,
+)
+from data_utils import build_position_index
 
 BASE_DIR = Path(__file__).resolve().parent
 ALL_CSV = BASE_DIR / "all_stores_final.csv"
 STORE_CSV = BASE_DIR / "Store_Master_Cleaned.csv"
 LOG_DIR = BASE_DIR / "logs"
 PROVINCE_MISMATCH_LOG = LOG_DIR / "province_mismatch.csv"
+# 高德结果缓存（跨运行复用）：逆地理编码按坐标保留 5 位小数（约 1 米）为键。
+# 条目带写入时间戳，超过有效期视为未命中；门店搜索结果随门店变动较快，有效期更短
+REGEO_CACHE_PATH = LOG_DIR / "regeo_cache.json"
+SEARCH_CACHE_PATH = LOG_DIR / "search_cache.json"
+REGEO_CACHE_MAX_AGE = 90 * 86400
+SEARCH_CACHE_MAX_AGE = 30 * 86400
 
 # 高德 API
 AMAP_REGEO_API = "https://restapi.amap.com/v3/geocode/regeo"
@@ -63,6 +83,11 @@ PROVINCE_ALIASES = {
     "香港": "香港特别行政区",
     "澳门": "澳门特别行政区",
 }
+_STANDARD_PROVINCES = frozenset(PROVINCE_ALIASES.values())
+# 前缀匹配用的正则（长别名优先），替代逐个 startswith 扫描
+_ALIAS_PATTERN = re.compile(
+    "^(" + "|".join(re.escape(a) for a in sorted(PROVINCE_ALIASES, key=len, reverse=True)) + ")"
+)
 
 
 def load_env_key() -> Optional[str]:
@@ -91,6 +116,29 @@ def load_env_key() -> Optional[str]:
 
 
 AMAP_KEY = load_env_key()
+SESSION = create_session()
+
+# 并发与限流：按高德 Key 的 QPS 配额设置
+MAX_WORKERS = 8
+RATE_LIMITER = RateLimiter(AMAP_QPS)
+# 门店搜索的关键词变体在共享线程池中并发请求；池大小固定，
+# 不随校验线程数放大，每个请求仍经过 RATE_LIMITER
+SEARCH_WORKERS = 4
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="amap-search")
+
+REGEO_CACHE = load_json_cache(REGEO_CACHE_PATH, max_age=REGEO_CACHE_MAX_AGE)
+SEARCH_CACHE = load_json_cache(SEARCH_CACHE_PATH, max_age=SEARCH_CACHE_MAX_AGE)
+_CACHE_SIZES = {REGEO_CACHE_PATH: len(REGEO_CACHE), SEARCH_CACHE_PATH: len(SEARCH_CACHE)}
+
+
+def save_json_caches() -> None:
+    """进程退出时写回有新增条目的缓存"""
+    for path, cache in ((REGEO_CACHE_PATH, REGEO_CACHE), (SEARCH_CACHE_PATH, SEARCH_CACHE)):
+        if len(cache) != _CACHE_SIZES[path]:
+            save_json_cache(path, cache)
+
+
+atexit.register(save_json_caches)
 
 
 def require_key():
@@ -112,19 +160,19 @@ def normalize_province(province: str) -> str:
     if province in PROVINCE_ALIASES:
         return PROVINCE_ALIASES[province]
     # 检查是否是别名的值（已经是标准格式）
-    if province in PROVINCE_ALIASES.values():
+    if province in _STANDARD_PROVINCES:
         return province
     # 尝试匹配前缀
-    for alias, standard in PROVINCE_ALIASES.items():
-        if province.startswith(alias):
-            return standard
-    return province
+    m = _ALIAS_PATTERN.match(province)
+    return PROVINCE_ALIASES[m.group(1)] if m else province
 
 
 def reverse_geocode(lat: float, lng: float) -> Optional[dict]:
     """
     使用高德逆地理编码API根据坐标获取地址信息
     
+    成功结果按坐标（保留 5 位小数）带时间戳缓存到 REGEO_CACHE，退出时落盘。
+    
     Args:
         lat: 纬度
         lng: 经度
@@ -132,6 +180,13 @@ def reverse_geocode(lat: float, lng: float) -> Optional[dict]:
     Returns:
         包含 province, city, district, address 的字典，失败返回 None
     """
+    lat = round(lat, 5)
+    lng = round(lng, 5)
+    cache_key = f"{lat:.5f},{lng:.5f}"
+    entry = REGEO_CACHE.get(cache_key)
+    if entry is not None:
+        return entry["result"]
+    
     require_key()
     
     params = {
@@ -142,7 +197,8 @@ def reverse_geocode(lat: float, lng: float) -> Optional[dict]:
     }
     
     try:
-        resp = requests.get(AMAP_REGEO_API, params=params, timeout=15)
+        RATE_LIMITER.acquire()
+        resp = SESSION.get(AMAP_REGEO_API, params=params, timeout=15)
         resp.raise_for_status()
         data = resp.json()
         
@@ -154,103 +210,150 @@ def reverse_geocode(lat: float, lng: float) -> Optional[dict]:
             return None
         
         address_component = regeo.get("addressComponent", {})
-        return {
+        result = {
             "province": address_component.get("province", ""),
             "city": address_component.get("city", "") or address_component.get("province", ""),
             "district": address_component.get("district", ""),
             "address": regeo.get("formatted_address", ""),
         }
+        # 省份为空（异常响应或境外坐标）不缓存，下次重新请求
+        if result["province"]:
+            REGEO_CACHE[cache_key] = cache_entry(result)
+        return result
     except Exception as e:
         print(f"[警告] 逆地理编码失败 ({lat}, {lng}): {e}")
         return None
 
 
+def search_keyword(
+    keyword: str,
+    store_name: str,
+    city: str,
+    brand: str,
+    stop: Optional[threading.Event] = None,
+) -> Optional[dict]:
+    """
+    用单个关键词在高德搜索门店，返回得分 >= 10 的最佳 POI 坐标，否则返回 None
+
+    stop 已置位（更高优先级的变体已命中）时不再发出请求
+    """
+    params = {
+        "key": AMAP_KEY,
+        "keywords": keyword,
+        "city": city,
+        "citylimit": "true",
+        "extensions": "all",
+        "offset": 5,
+        "page": 1,
+    }
+    
+    try:
+        RATE_LIMITER.acquire()
+        if stop is not None and stop.is_set():
+            return None
+        resp = SESSION.get(AMAP_TEXT_API, params=params, timeout=15)
+        resp.raise_for_status()
+        data = resp.json()
+        
+        if data.get("status") != "1":
+            return None
+        
+        pois = data.get("pois", []) or []
+        if not pois:
+            return None
+        
+        best_match = None
+        best_score = 0
+        # 去后缀的门店名与 POI 无关，循环外只算一次
+        bare_store_name = STORE_SUFFIX_PATTERN.sub("", store_name).strip()
+        
+        for poi in pois:
+            poi_name = poi.get("name", "")
+            poi_address = poi.get("address", "")
+            
+            name_match = (
+                store_name in poi_name or 
+                poi_name in store_name or
+                bare_store_name in poi_name
+            )
+            
+            brand_match = brand.lower() in poi_name.lower() or brand.lower() in poi_address.lower()
+            
+            score = 0
+            if name_match:
+                score += 10
+            if brand_match:
+                score += 5
+            if city in poi_address or city in poi_name:
+                score += 3
+            
+            if score > best_score:
+                best_score = score
+                best_match = poi
+        
+        if not best_match or best_score < 10:
+            return None
+        
+        loc = best_match.get("location", "")
+        if "," not in loc:
+            return None
+        
+        lng_str, lat_str = loc.split(",", 1)
+        return {
+            "lat": float(lat_str),
+            "lng": float(lng_str),
+            "amap_name": best_match.get("name", ""),
+            "amap_address": best_match.get("address", ""),
+            "amap_province": best_match.get("pname", ""),
+            "amap_city": best_match.get("cityname", ""),
+            "match_score": best_score,
+        }
+    
+    except Exception as e:
+        print(f"[错误] 搜索 '{keyword}' 时出错: {e}")
+        return None
+
+
 def search_store_by_name(store_name: str, city: str, brand: str) -> Optional[dict]:
     """
-    通过门店名称搜索精准的经纬度
+    通过门店名称搜索精准的经纬度（命中结果按 品牌|城市|门店名 缓存到 SEARCH_CACHE）
+    
+    三个关键词变体提交到共享线程池 _SEARCH_EXECUTOR 并发请求，按 品牌+城市+门店名 →
+    城市+门店名 → 门店名 的优先级取第一个命中的结果；命中后取消尚未开始的变体，
+    已在排队等待限流的变体也不再发出请求。
     """
     require_key()
     
     if not store_name or not city:
         return None
     
-    keywords_list = [
+    cache_key = f"{brand}|{city}|{store_name}"
+    entry = SEARCH_CACHE.get(cache_key)
+    if entry is not None:
+        return entry["result"]
+    
+    # 品牌为空等情况下变体会重复，按顺序去重避免重复请求
+    keywords_list = list(dict.fromkeys([
         f"{brand} {city} {store_name}".strip(),
         f"{city} {store_name}".strip(),
         store_name.strip(),
-    ]
+    ]))
     
-    for keyword in keywords_list:
-        params = {
-            "key": AMAP_KEY,
-            "keywords": keyword,
-            "city": city,
-            "citylimit": "true",
-            "extensions": "all",
-            "offset": 5,
-            "page": 1,
-        }
-        
-        try:
-            resp = requests.get(AMAP_TEXT_API, params=params, timeout=15)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            if data.get("status") != "1":
-                continue
-            
-            pois = data.get("pois", []) or []
-            if not pois:
-                continue
-            
-            best_match = None
-            best_score = 0
-            
-            for poi in pois:
-                poi_name = poi.get("name", "")
-                poi_address = poi.get("address", "")
-                
-                name_match = (
-                    store_name in poi_name or 
-                    poi_name in store_name or
-                    store_name.replace("授权体验店", "").replace("照材店", "").strip() in poi_name
-                )
-                
-                brand_match = brand.lower() in poi_name.lower() or brand.lower() in poi_address.lower()
-                
-                score = 0
-                if name_match:
-                    score += 10
-                if brand_match:
-                    score += 5
-                if city in poi_address or city in poi_name:
-                    score += 3
-                
-                if score > best_score:
-                    best_score = score
-                    best_match = poi
-            
-            if best_match and best_score >= 10:
-                loc = best_match.get("location", "")
-                if "," not in loc:
-                    continue
-                
-                lng_str, lat_str = loc.split(",", 1)
-                return {
-                    "lat": float(lat_str),
-                    "lng": float(lng_str),
-                    "amap_name": best_match.get("name", ""),
-                    "amap_address": best_match.get("address", ""),
-                    "amap_province": best_match.get("pname", ""),
-                    "amap_city": best_match.get("cityname", ""),
-                    "match_score": best_score,
-                }
-            
-            time.sleep(0.2)
-            
-        except Exception as e:
-            print(f"[错误] 搜索 '{keyword}' 时出错: {e}")
-            continue
+    stop = threading.Event()
+    futures = [
+        _SEARCH_EXECUTOR.submit(search_keyword, keyword, store_name, city, brand, stop)
+        for keyword in keywords_list
+    ]
+    try:
+        for future in futures:
+            result = future.result()
+            if result:
+                SEARCH_CACHE[cache_key] = cache_entry(result)
+                return result
+    finally:
+        stop.set()
+        for future in futures:
+            future.cancel()
     
     return None
 
@@ -284,13 +387,107 @@ def check_province_match(declared_province: str, actual_province: str) -> bool:
     return False
 
 
-def validate_and_fix_stores(dry_run: bool = False, limit: Optional[int] = None):
+def validate_one_store(row: dict, dry_run: bool) -> tuple[str, Optional[dict], list[str]]:
+    """
+    校验单个门店（可在线程池中并发执行，不修改任何 DataFrame）
+
+    Returns:
+        (状态, 不匹配记录, 日志行)；状态为 "skip" / "ok" / "error" / "mismatch"
+    """
+    store_id = row["store_id"]
+    name = str(row.get("name") or "").strip()
+    declared_province = str(row.get("province") or "").strip()
+    city = str(row.get("city") or "").strip()
+    brand = str(row.get("brand") or "").strip() or "DJI"
+    
+    # 获取坐标
+    lat = row.get("corrected_lat")
+    lng = row.get("corrected_lng")
+    if pd.isna(lat) or pd.isna(lng):
+        lat = row.get("lat")
+        lng = row.get("lng")
+    
+    if pd.isna(lat) or pd.isna(lng):
+        return "skip", None, []
+    
+    lat = float(lat)
+    lng = float(lng)
+    
+    # 逆地理编码获取实际省份
+    regeo = reverse_geocode(lat, lng)
+    if not regeo:
+        return "error", None, []
+    
+    actual_province = regeo.get("province", "")
+    
+    # 检查省份是否匹配
+    if check_province_match(declared_province, actual_province):
+        return "ok", None, []
+    
+    # 发现不匹配
+    logs = [
+        f"  门店: {brand} - {name}",
+        f"  声明省份: {declared_province}",
+        f"  实际省份: {actual_province} (坐标: {lat:.6f}, {lng:.6f})",
+        f"  实际地址: {regeo.get('address', '')}",
+    ]
+    
+    mismatch_record = {
+        "store_id": store_id,
+        "brand": brand,
+        "name": name,
+        "declared_province": declared_province,
+        "declared_city": city,
+        "actual_province": actual_province,
+        "actual_address": regeo.get("address", ""),
+        "old_lat": lat,
+        "old_lng": lng,
+        "new_lat": None,
+        "new_lng": None,
+        "fixed": False,
+        "fix_method": None,
+    }
+    
+    if not dry_run:
+        # 尝试修复：重新搜索正确坐标
+        logs.append("  尝试修复...")
+        result = search_store_by_name(name, city, brand)
+        
+        if result:
+            new_lat = result["lat"]
+            new_lng = result["lng"]
+            
+            # 验证新坐标的省份
+            new_regeo = reverse_geocode(new_lat, new_lng)
+            if new_regeo and check_province_match(declared_province, new_regeo.get("province", "")):
+                logs.append("  ✓ 修复成功!")
+                logs.append(f"    新坐标: {new_lat:.6f}, {new_lng:.6f}")
+                logs.append(f"    高德名称: {result.get('amap_name', '')}")
+                logs.append(f"    高德地址: {result.get('amap_address', '')}")
+                mismatch_record["new_lat"] = new_lat
+                mismatch_record["new_lng"] = new_lng
+                mismatch_record["fixed"] = True
+                mismatch_record["fix_method"] = "amap_search"
+            else:
+                logs.append("  ✗ 搜索到的坐标仍然不在正确省份，跳过")
+        else:
+            logs.append("  ✗ 高德搜索未找到匹配结果")
+    
+    return "mismatch", mismatch_record, logs
+
+
+def validate_and_fix_stores(
+    dry_run: bool = False,
+    limit: Optional[int] = None,
+    max_workers: int = MAX_WORKERS,
+):
     """
     验证门店坐标与省份是否匹配，并自动修复不匹配的门店
     
     Args:
         dry_run: 如果为True，只检测不修复
         limit: 限制检测的门店数量（用于测试）
+        max_workers: 并发请求高德 API 的线程数（整体 QPS 由 RATE_LIMITER 控制）
     """
     all_df, store_df = load_data()
     
@@ -316,102 +513,44 @@ def validate_and_fix_stores(dry_run: bool = False, limit: Optional[int] = None):
     
     print(f"[信息] 开始验证 {total} 条门店的省份匹配情况...")
     print(f"[信息] 模式: {'检测模式（不会修改文件）' if dry_run else '修复模式'}")
+    print(f"[信息] 并发线程数: {max_workers}，限流: {AMAP_QPS} QPS")
     print("-" * 80)
     
-    for idx, row in merged.iterrows():
-        store_id = row["store_id"]
-        name = str(row.get("name") or "").strip()
-        declared_province = str(row.get("province") or "").strip()
-        city = str(row.get("city") or "").strip()
-        brand = str(row.get("brand") or "").strip() or "DJI"
-        
-        # 获取坐标
-        lat = row.get("corrected_lat")
-        lng = row.get("corrected_lng")
-        if pd.isna(lat) or pd.isna(lng):
-            lat = row.get("lat")
-            lng = row.get("lng")
-        
-        if pd.isna(lat) or pd.isna(lng):
-            continue
-        
-        lat = float(lat)
-        lng = float(lng)
-        
-        # 逆地理编码获取实际省份
-        regeo = reverse_geocode(lat, lng)
-        if not regeo:
-            error_count += 1
-            continue
-        
-        actual_province = regeo.get("province", "")
-        
-        # 检查省份是否匹配
-        if check_province_match(declared_province, actual_province):
-            continue
-        
-        # 发现不匹配
-        print(f"\n[{idx + 1}/{total}] 发现省份不匹配!")
-        print(f"  门店: {brand} - {name}")
-        print(f"  声明省份: {declared_province}")
-        print(f"  实际省份: {actual_province} (坐标: {lat:.6f}, {lng:.6f})")
-        print(f"  实际地址: {regeo.get('address', '')}")
-        
-        mismatch_record = {
-            "store_id": store_id,
-            "brand": brand,
-            "name": name,
-            "declared_province": declared_province,
-            "declared_city": city,
-            "actual_province": actual_province,
-            "actual_address": regeo.get("address", ""),
-            "old_lat": lat,
-            "old_lng": lng,
-            "new_lat": None,
-            "new_lng": None,
-            "fixed": False,
-            "fix_method": None,
-        }
-        
-        if not dry_run:
-            # 尝试修复：重新搜索正确坐标
-            print(f"  尝试修复...")
-            result = search_store_by_name(name, city, brand)
+    # id -> 行位置索引，修复时直接定位，避免每次整列比较
+    store_pos = build_position_index(store_df["store_id"])
+    all_pos = build_position_index(all_df["uuid"])
+    
+    # 网络请求在线程池中并发执行；DataFrame 的修改统一在主线程完成
+    rows = merged.to_dict("records")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda r: validate_one_store(r, dry_run), rows)
+        for pos, (status, mismatch_record, logs) in enumerate(results, start=1):
+            if status == "error":
+                error_count += 1
+            if mismatch_record is None:
+                continue
             
-            if result:
-                new_lat = result["lat"]
-                new_lng = result["lng"]
+            print(f"\n[{pos}/{total}] 发现省份不匹配!")
+            for line in logs:
+                print(line)
+            
+            if mismatch_record["fixed"]:
+                store_id = mismatch_record["store_id"]
+                new_lat = mismatch_record["new_lat"]
+                new_lng = mismatch_record["new_lng"]
                 
-                # 验证新坐标的省份
-                new_regeo = reverse_geocode(new_lat, new_lng)
-                if new_regeo and check_province_match(declared_province, new_regeo.get("province", "")):
-                    print(f"  ✓ 修复成功!")
-                    print(f"    新坐标: {new_lat:.6f}, {new_lng:.6f}")
-                    print(f"    高德名称: {result.get('amap_name', '')}")
-                    print(f"    高德地址: {result.get('amap_address', '')}")
-                    
-                    # 更新 Store_Master
-                    store_mask = store_df["store_id"] == store_id
-                    store_df.loc[store_mask, "corrected_lat"] = new_lat
-                    store_df.loc[store_mask, "corrected_lng"] = new_lng
-                    
-                    # 更新 all_stores_final
-                    all_mask = all_df["uuid"].astype(str) == str(store_id)
-                    all_df.loc[all_mask, "lat"] = new_lat
-                    all_df.loc[all_mask, "lng"] = new_lng
-                    
-                    mismatch_record["new_lat"] = new_lat
-                    mismatch_record["new_lng"] = new_lng
-                    mismatch_record["fixed"] = True
-                    mismatch_record["fix_method"] = "amap_search"
-                    fixed_count += 1
-                else:
-                    print(f"  ✗ 搜索到的坐标仍然不在正确省份，跳过")
-            else:
-                print(f"  ✗ 高德搜索未找到匹配结果")
-        
-        mismatch_records.append(mismatch_record)
-        time.sleep(0.3)  # 避免请求过快
+                # 更新 Store_Master
+                store_rows = store_df.index[store_pos.get(str(store_id).strip(), [])]
+                store_df.loc[store_rows, "corrected_lat"] = new_lat
+                store_df.loc[store_rows, "corrected_lng"] = new_lng
+                
+                # 更新 all_stores_final
+                all_rows = all_df.index[all_pos.get(str(store_id).strip(), [])]
+                all_df.loc[all_rows, "lat"] = new_lat
+                all_df.loc[all_rows, "lng"] = new_lng
+                fixed_count += 1
+            
+            mismatch_records.append(mismatch_record)
     
     # 保存不匹配记录
     if mismatch_records:
@@ -421,13 +560,13 @@ def validate_and_fix_stores(dry_run: bool = False, limit: Optional[int] = None):
     
     # 保存修复后的数据
     if not dry_run and fixed_count > 0:
-        # 创建备份
+        # 创建备份：直接复制修复前的原文件，不再重复序列化整表
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_all = ALL_CSV.with_suffix(f".csv.backup_province_{timestamp}")
         backup_store = STORE_CSV.with_suffix(f".csv.backup_province_{timestamp}")
         
-        all_df.to_csv(backup_all, index=False, encoding="utf-8-sig")
-        store_df.to_csv(backup_store, index=False, encoding="utf-8-sig")
+        shutil.copy2(ALL_CSV, backup_all)
+        shutil.copy2(STORE_CSV, backup_store)
         print(f"\n[备份] all_stores_final -> {backup_all.name}")
         print(f"[备份] Store_Master_Cleaned -> {backup_store.name}")
         
@@ -462,11 +601,17 @@ def main():
         default=None,
         help="限制检测的门店数量（用于测试）"
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"并发线程数（默认 {MAX_WORKERS}）"
+    )
     
     args = parser.parse_args()
     
     try:
-        validate_and_fix_stores(dry_run=args.dry_run, limit=args.limit)
+        validate_and_fix_stores(dry_run=args.dry_run, limit=args.limit, max_workers=args.workers)
     except KeyboardInterrupt:
         print("\n\n[中断] 用户中断操作")
         sys.exit(1)